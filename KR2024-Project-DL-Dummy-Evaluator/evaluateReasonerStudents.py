@@ -1,6 +1,6 @@
 #! /usr/bin/python3
 
-import sys,glob,subprocess, os.path
+import sys,glob,subprocess, os.path, time, signal, argparse, multiprocessing
 
 testDataPath = "TestData"
 
@@ -8,8 +8,6 @@ testData = [(name+".owl", name+"-subsumers.txt") for name in
             [file [:-4] for file in glob.glob("*.owl",root_dir=testDataPath)]
             ]
 
-print(testData)
-
 def testReasoner(reasonerPythonFile):
 
     results = []
@@ -73,6 +71,110 @@ def testReasoner(reasonerPythonFile):
     outputfile.close()
 
 
-reasoner = "../main.py"
+# In-process mode: instead of starting the reasoner once per ontology, ELReasoner is imported and every ontology is
+# loaded once in a worker of a pool, which then answers all test cases of that ontology. Every test case has its
+# own timeout, enforced with SIGALRM in the worker. Where there is no SIGALRM (Windows), the parent stops waiting
+# for a test case after the timeout instead (counted from the previous result, so a case may get more time, but
+# never less), and the pool is terminated at the end.
+
+testClass = "A"
+
+
+class TestCaseTimeout(Exception):
+    pass
+
+
+def raiseTimeout(signalNumber, frame):
+    raise TestCaseTimeout()
+
+
+def initWorker(reasonerDirectory):
+    sys.path.insert(0, os.path.abspath(reasonerDirectory))
+
+
+def runOntology(ontologyFile, subsumersFile, timeout):
+    # Runs the test cases of one ontology, returns (ontologyFile, success, error, seconds)
+    from el_reasoner import ELReasoner
+    from owl_loader import load_tbox
+
+    start = time.perf_counter()
+    useAlarm = hasattr(signal, "SIGALRM")
+    if useAlarm:
+        signal.signal(signal.SIGALRM, raiseTimeout)
+        signal.alarm(timeout)
+    try:
+        reasoner = ELReasoner(load_tbox(os.path.abspath(testDataPath+"/"+ontologyFile)))
+        outputLines = set(reasoner.get_all_subsumers(testClass))
+        error = ""
+    except TestCaseTimeout:
+        outputLines = None
+        error = "timeout after "+str(timeout)+" s"
+    except Exception as e:
+        outputLines = None
+        error = repr(e)
+    finally:
+        if useAlarm:
+            signal.alarm(0)
+    seconds = time.perf_counter() - start
+
+    with open(testDataPath+"/"+subsumersFile) as file:
+        expectedSubsumers = set([line.strip() for line in file.readlines()])
+
+    if "" in expectedSubsumers:
+        expectedSubsumers.remove("")
+
+    return (ontologyFile, str(outputLines==expectedSubsumers), error, seconds)
+
+
+def testReasonerInProcess(reasonerPythonFile, jobs, timeout):
+
+    reasonerDirectory = os.path.dirname(reasonerPythonFile) or "."
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(jobs, initializer=initWorker, initargs=(reasonerDirectory,)) as pool:
+        pending = [(ontologyFile, pool.apply_async(runOntology, (ontologyFile, subsumersFile, timeout)))
+                   for (ontologyFile, subsumersFile) in testData]
+        results = []
+        for (ontologyFile, result) in pending:
+            try:
+                # With SIGALRM, the worker always answers within the timeout, so the parent waits a little longer
+                results.append(result.get(timeout + 5 if hasattr(signal, "SIGALRM") else timeout))
+            except multiprocessing.TimeoutError:
+                results.append((ontologyFile, "False", "timeout after "+str(timeout)+" s", float(timeout)))
+    total = time.perf_counter() - start
+
+    results.sort(key = lambda x : x[0])
+
+    with open("output.out", mode='a') as outputfile:
+        print(file=outputfile)
+        for (ontologyFile, success, error, seconds) in results:
+            print(ontologyFile, success, "%.3f" % seconds, error, file=outputfile)
+
+    print("%-40s %-8s %10s" % ("filename", "success", "time (s)"))
+    for (ontologyFile, success, error, seconds) in results:
+        print("%-40s %-8s %10.3f %s" % (ontologyFile, success, seconds, error))
+    print("%d ontologies in %.3f s with %d workers" % (len(results), total, jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("reasoner", nargs="?", default="../main.py")
+    parser.add_argument("--in-process", action="store_true",
+                        help="import the reasoner and run the test cases in a worker pool instead of one subprocess "
+                             "each")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=int, default=60, help="timeout per test case in seconds")
+    args = parser.parse_args()
+
+    print(testData)
+
+    if args.in_process:
+        testReasonerInProcess(args.reasoner, args.jobs, args.timeout)
+    else:
+        testReasoner(args.reasoner)
+
 
-testReasoner(reasoner)
+# The workers of the pool import this file again with the spawn start method (macOS, Windows), so it must only run
+# the tests when it is the main program
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from el_reasoner import ELReasoner
+from ontology_cache import load_compiled_ontology
+
+# asyncio API for loading many ontologies and querying them concurrently:
+#
+#     async with AsyncReasoner() as reasoner:
+#         ontologies = await asyncio.gather(*(reasoner.load_ontology(path) for path in paths))
+#         subsumers = await reasoner.subsumers(ontologies[0], "Pizza")
+#
+# Loading never blocks the event loop. With the py4j backend, parsing and converting an ontology mostly waits for
+# the JVM, so ontologies are loaded in threads, each with a connection from a bounded pool of gateway connections.
+# With the native backend, parsing is pure Python, so ontologies are loaded in worker processes (threads would
+# only take turns holding the GIL). Either way, loading N ontologies takes about as long as loading the slowest
+# one, as long as there are enough gateway connections or cores. Saturation runs in a thread of an executor, one
+# query at a time per ontology, as reasoners are not thread-safe.
+
+
+def new_gateway():
+    from gateway import connect_gateway
+
+    return connect_gateway()
+
+
+def mark_gateway_used():
+    from gateway import mark_used
+
+    mark_used()
+
+
+class GatewayPool(object):
+    # Bounded pool of py4j gateway connections. Connections are opened when they are first needed, at most size of
+    # them are in use at the same time, and they are reused afterwards. Reusing a connection does not go through
+    # connect_gateway, so acquire and release mark the managed JVM as used (see gateway.py). acquire blocks, so it
+    # has to be called from a thread of an executor, not from the event loop.
+    def __init__(self, size=4, gateway_factory=new_gateway):
+        self.size = size
+        self.gateway_factory = gateway_factory
+        self.available = threading.BoundedSemaphore(size)
+        self.idle = queue.LifoQueue()
+        self.gateways = []  # All connections opened by the pool
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        self.available.acquire()
+        try:
+            gateway = self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            mark_gateway_used()
+            return gateway
+        try:
+            gateway = self.gateway_factory()
+        except BaseException:
+            self.available.release()
+            raise
+        with self.lock:
+            self.gateways.append(gateway)
+        return gateway
+
+    def release(self, gateway):
+        mark_gateway_used()
+        self.idle.put(gateway)
+        self.available.release()
+
+    @contextlib.contextmanager
+    def connection(self):
+        gateway = self.acquire()
+        try:
+            yield gateway
+        finally:
+            self.release(gateway)
+
+    def close(self):
+        with self.lock:
+            gateways, self.gateways = self.gateways, []
+        for gateway in gateways:
+            gateway.close()
+
+
+class LoadedOntology(object):
+    # An ontology loaded by AsyncReasoner: its file, and the reasoner that answers the queries on it
+    def __init__(self, path, reasoner):
+        self.path = path
+        self.reasoner = reasoner
+        self.lock = asyncio.Lock()  # Queries on the same reasoner run one at a time
+
+
+class AsyncReasoner(object):
+    def __init__(self, gateway_pool_size=4, load_processes=None, engine="worklist", labels="set", use_cache=True):
+        # gateway_pool_size bounds the number of py4j connections (and of threads loading with py4j), and
+        # load_processes the number of processes loading with the native parser (default: number of CPUs)
+        self.gateway_pool = GatewayPool(gateway_pool_size)
+        self.load_processes = load_processes or os.cpu_count() or 1
+        self.engine = engine
+        self.labels = labels
+        self.use_cache = use_cache
+        self.thread_executor = ThreadPoolExecutor(max_workers=gateway_pool_size + 1)
+        self.process_executor = None  # Started on the first native load
+
+    async def load_ontology(self, path, backend="native"):
+        # Coroutine that loads (and compiles) an ontology file, without blocking the event loop
+        loop = asyncio.get_running_loop()
+        if backend == "native":
+            if self.process_executor is None:
+                self.process_executor = ProcessPoolExecutor(max_workers=self.load_processes)
+            compiled = await loop.run_in_executor(self.process_executor, load_compiled_ontology, path, backend,
+                                                  self.use_cache)
+        elif backend == "py4j":
+            compiled = await loop.run_in_executor(self.thread_executor, self.load_with_gateway, path)
+        else:
+            raise ValueError("Unknown backend: " + str(backend))
+        return LoadedOntology(path, ELReasoner(compiled, engine=self.engine, labels=self.labels))
+
+    def load_with_gateway(self, path):
+        with self.gateway_pool.connection() as gateway:
+            return load_compiled_ontology(path, backend="py4j", use_cache=self.use_cache, gateway=gateway)
+
+    async def run(self, ontology, function, *args):
+        # Coroutine that runs a method of the reasoner of an ontology in an executor
+        async with ontology.lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.thread_executor, function, *args)
+
+    async def subsumers(self, ontology, class_name):
+        return await self.run(ontology, ontology.reasoner.get_all_subsumers, class_name)
+
+    async def is_subsumed_by(self, ontology, class_name, subsumer_name):
+        return await self.run(ontology, ontology.reasoner.is_subsumed_by, class_name, subsumer_name)
+
+    async def classify(self, ontology):
+        return await self.run(ontology, ontology.reasoner.classify)
+
+    def close(self):
+        self.thread_executor.shutdown()
+        if self.process_executor is not None:
+            self.process_executor.shutdown()
+        self.gateway_pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        self.close()
@@ -0,0 +1,105 @@
+from normal_form import NF1, NF2, NF3, is_told_edge
+from told_hierarchy import compute_told_closure
+
+
+class AxiomIndex(object):
+    # Rule tables of the normal form axioms (see normal_form.py), so that each completion rule directly looks up the
+    # axioms that can fire for a given concept, instead of scanning the whole TBox. Every form has a dense table,
+    # i.e. a list indexed by concept ID, with None for the concepts that have no axiom of that form:
+    # - told_superclasses maps A to the Bs with A ⊑ B (NF1), except when A and B are both concept names
+    # - conjunctions_by_conjunct maps A1 to the pairs (A2, B) with A1 ⊓ A2 ⊑ B or A2 ⊓ A1 ⊑ B (NF2)
+    # - existentials_by_concept maps A to the pairs (r, B) with A ⊑ ∃r.B (NF3)
+    # - existentials_by_filler maps A to the pairs (r, B) with ∃r.A ⊑ B (NF4)
+    # The axioms A ⊑ B between concept names form the told hierarchy instead: told_edges maps A to these Bs, and
+    # told_closure maps A to all concept names it is subsumed by in the told hierarchy (see told_hierarchy.py).
+    # relevant is the set of relevant concepts, i.e. those that are reported as subsumers.
+    # The tables are kept up to date by the compiled ontology when axioms are added or removed, and grow with the
+    # concept factory (see ensure_size).
+    def __init__(self, factory):
+        self.factory = factory
+        self.relevant = set()
+        self.told_edges = {}
+        self.told_closure = {}  # None if it has to be computed again, because the told hierarchy changed
+        self.told_superclasses = []
+        self.conjunctions_by_conjunct = []
+        self.existentials_by_concept = []
+        self.existentials_by_filler = []
+        self.size = 0
+
+    def ensure_size(self, size):
+        # Function to make the tables cover the concept IDs up to size
+        if size > self.size:
+            padding = [None] * (size - self.size)
+            for table in (self.told_superclasses, self.conjunctions_by_conjunct, self.existentials_by_concept,
+                          self.existentials_by_filler):
+                table.extend(padding)
+            self.size = size
+
+    def add(self, axiom):
+        # Function to add a normal form axiom (a tuple, see normal_form.py) to the tables
+        form = axiom[0]
+        if form == NF1:
+            if is_told_edge(self.factory, axiom):
+                self.told_edges.setdefault(axiom[1], []).append(axiom[2])
+                self.told_closure = None
+            else:
+                add_to_table(self.told_superclasses, axiom[1], axiom[2])
+        elif form == NF2:
+            _, left, right, conclusion = axiom
+            add_to_table(self.conjunctions_by_conjunct, left, (right, conclusion))
+            if left != right:
+                add_to_table(self.conjunctions_by_conjunct, right, (left, conclusion))
+        elif form == NF3:
+            add_to_table(self.existentials_by_concept, axiom[1], (axiom[2], axiom[3]))
+        else:
+            _, role, filler, conclusion = axiom
+            add_to_table(self.existentials_by_filler, filler, (role, conclusion))
+
+    def remove(self, axiom):
+        form = axiom[0]
+        if form == NF1:
+            if is_told_edge(self.factory, axiom):
+                remove_from_index(self.told_edges, axiom[1], axiom[2])
+                self.told_closure = None
+            else:
+                remove_from_table(self.told_superclasses, axiom[1], axiom[2])
+        elif form == NF2:
+            _, left, right, conclusion = axiom
+            remove_from_table(self.conjunctions_by_conjunct, left, (right, conclusion))
+            if left != right:
+                remove_from_table(self.conjunctions_by_conjunct, right, (left, conclusion))
+        elif form == NF3:
+            remove_from_table(self.existentials_by_concept, axiom[1], (axiom[2], axiom[3]))
+        else:
+            _, role, filler, conclusion = axiom
+            remove_from_table(self.existentials_by_filler, filler, (role, conclusion))
+
+    def get_told_closure(self):
+        # The closure is computed again (all at once) on the first use after the told hierarchy changed
+        if self.told_closure is None:
+            self.told_closure = compute_told_closure(self.told_edges)
+        return self.told_closure
+
+
+def add_to_table(table, concept, value):
+    values = table[concept]
+    if values is None:
+        table[concept] = [value]
+    else:
+        values.append(value)
+
+
+def remove_from_table(table, concept, value):
+    values = table[concept]
+    if values is not None and value in values:
+        values.remove(value)
+        if not values:
+            table[concept] = None
+
+
+def remove_from_index(index, key, value):
+    values = index.get(key)
+    if values is not None and value in values:
+        values.remove(value)
+        if not values:
+            del index[key]
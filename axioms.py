@@ -0,0 +1,228 @@
+class Concept(object):
+    # Base class of the native concept model. Concepts are immutable and compared structurally, so that they can be
+    # used as set members and dictionary keys by the reasoner.
+    def _key(self):
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self).__name__, self._key()))
+
+    def __repr__(self):
+        return type(self).__name__ + "(" + str(self) + ")"
+
+
+class ConceptName(Concept):
+    def __init__(self, name):
+        self.name = name
+
+    def _key(self):
+        return self.name
+
+    def __str__(self):
+        return self.name
+
+
+class TopConcept(Concept):
+    def _key(self):
+        return ()
+
+    def __str__(self):
+        return "⊤"
+
+
+class ConceptConjunction(Concept):
+    def __init__(self, conjuncts):
+        self.conjuncts = tuple(conjuncts)
+
+    def _key(self):
+        return self.conjuncts
+
+    def __str__(self):
+        return "(" + " ⊓ ".join(str(conjunct) for conjunct in self.conjuncts) + ")"
+
+
+class ExistentialRoleRestriction(Concept):
+    def __init__(self, role, filler):
+        self.role = role
+        self.filler = filler
+
+    def _key(self):
+        return self.role, self.filler
+
+    def __str__(self):
+        return "∃" + self.role + "." + str(self.filler)
+
+
+TOP = TopConcept()
+
+
+class Axiom(object):
+    # Base class of GCIs and equivalence axioms, which are compared structurally like concepts
+    def __init__(self, lhs, rhs):
+        self.lhs = lhs
+        self.rhs = rhs
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.lhs == other.lhs and self.rhs == other.rhs
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.lhs, self.rhs))
+
+    def __repr__(self):
+        return type(self).__name__ + "(" + str(self) + ")"
+
+
+class GeneralConceptInclusion(Axiom):
+    def __str__(self):
+        return str(self.lhs) + " ⊑ " + str(self.rhs)
+
+
+class EquivalenceAxiom(Axiom):
+    def __str__(self):
+        return str(self.lhs) + " ≡ " + str(self.rhs)
+
+
+class TBox(object):
+    # Pure-Python snapshot of the TBox of an ontology: a list of GCIs and equivalence axioms over the concept model
+    # above, together with all concept names that occur in (or are declared by) the ontology.
+    def __init__(self, axioms=None, concept_names=None):
+        self.axioms = list(axioms or [])
+        self.concept_names = set(concept_names or [])
+        for axiom in self.axioms:
+            self.concept_names.update(collect_concept_names(axiom.lhs))
+            self.concept_names.update(collect_concept_names(axiom.rhs))
+
+    def add_axiom(self, axiom):
+        self.axioms.append(axiom)
+        self.concept_names.update(collect_concept_names(axiom.lhs))
+        self.concept_names.update(collect_concept_names(axiom.rhs))
+
+    def remove_axiom(self, axiom):
+        # The concept names of the axiom stay declared
+        self.axioms.remove(axiom)
+
+
+def collect_concept_names(concept):
+    # Function to collect the names of all concept names occurring in a concept
+    if isinstance(concept, ConceptName):
+        return {concept.name}
+    if isinstance(concept, ConceptConjunction):
+        names = set()
+        for conjunct in concept.conjuncts:
+            names.update(collect_concept_names(conjunct))
+        return names
+    if isinstance(concept, ExistentialRoleRestriction):
+        return collect_concept_names(concept.filler)
+    return set()
+
+
+def make_conjunction(conjuncts):
+    # Function to build a conjunction from a list of conjuncts, leaving out the conjuncts that could not be
+    # represented (None). Returns None if nothing is left, and the conjunct itself if only one is left.
+    conjuncts = [conjunct for conjunct in conjuncts if conjunct is not None]
+    if not conjuncts:
+        return None
+    if len(conjuncts) == 1:
+        return conjuncts[0]
+    return ConceptConjunction(conjuncts)
+
+
+def make_inclusion_axioms(lhs, rhs, lhs_complete=True):
+    # Function to build the axioms for lhs ⊑ rhs. Parts of a concept outside of EL are represented by None, or are
+    # left out of conjunctions. Leaving out a part only weakens the RHS, which is sound, while an incomplete LHS
+    # would make the axiom too strong, so in that case the axiom is dropped.
+    if lhs is None or rhs is None or not lhs_complete:
+        return []
+    return [GeneralConceptInclusion(lhs, rhs)]
+
+
+def make_equivalence_axioms(lhs, rhs, lhs_complete=True, rhs_complete=True):
+    # Function to build the axioms for lhs ≡ rhs. If one side was weakened because it contained constructs outside
+    # of EL, only the inclusion towards the weakened side is kept.
+    if lhs is None or rhs is None:
+        return []
+    if lhs_complete and rhs_complete:
+        return [EquivalenceAxiom(lhs, rhs)]
+    if lhs_complete:
+        return [GeneralConceptInclusion(lhs, rhs)]
+    if rhs_complete:
+        return [GeneralConceptInclusion(rhs, lhs)]
+    return []
+
+
+def binary_conjunctions(concept):
+    # Function to rewrite all conjunctions in a concept so that they have exactly two conjuncts, e.g.
+    # (A ⊓ B ⊓ C) becomes (A ⊓ (B ⊓ C))
+    if isinstance(concept, ConceptConjunction):
+        conjuncts = [binary_conjunctions(conjunct) for conjunct in concept.conjuncts]
+        binary = conjuncts[-1]
+        for conjunct in reversed(conjuncts[:-1]):
+            binary = ConceptConjunction((conjunct, binary))
+        return binary
+    if isinstance(concept, ExistentialRoleRestriction):
+        return ExistentialRoleRestriction(concept.role, binary_conjunctions(concept.filler))
+    return concept
+
+
+def convert_to_binary_conjunctions(tbox):
+    # Native counterpart of gateway.convertToBinaryConjunctions: the completion rules assume that conjunctions are
+    # always over two concepts
+    for axiom in tbox.axioms:
+        axiom.lhs = binary_conjunctions(axiom.lhs)
+        axiom.rhs = binary_conjunctions(axiom.rhs)
+
+
+def load_tbox_from_gateway(ontology, formatter):
+    # Function to take a snapshot of the TBox of an ontology parsed by dl4python. The axioms are fetched from the
+    # gateway once and converted into the native concept model, so that the reasoner never has to call back into
+    # the JVM afterwards.
+
+    def format_name(java_object):
+        return formatter.format(java_object).replace('"', '').strip()
+
+    def convert(concept):
+        # Returns the converted concept and whether it could be converted without leaving anything out
+        concept_type = concept.getClass().getSimpleName()
+        if concept_type == "ConceptName":
+            return ConceptName(format_name(concept)), True
+        if concept_type == "TopConcept$":
+            return TOP, True
+        if concept_type == "ExistentialRoleRestriction":
+            filler, complete = convert(concept.filler())
+            if filler is None:
+                return None, False
+            return ExistentialRoleRestriction(format_name(concept.role()), filler), complete
+        if concept_type == "ConceptConjunction":
+            conjuncts = []
+            complete = True
+            for java_conjunct in concept.getConjuncts():
+                conjunct, conjunct_complete = convert(java_conjunct)
+                complete = complete and conjunct_complete
+                conjuncts.append(conjunct)
+            return make_conjunction(conjuncts), complete
+        return None, False
+
+    axioms = []
+    for axiom in ontology.tbox().getAxioms():
+        axiom_type = axiom.getClass().getSimpleName()
+        if axiom_type == "GeneralConceptInclusion":
+            lhs, lhs_complete = convert(axiom.lhs())
+            rhs, _ = convert(axiom.rhs())
+            axioms.extend(make_inclusion_axioms(lhs, rhs, lhs_complete))
+        elif axiom_type == "EquivalenceAxiom":
+            converted = [convert(concept) for concept in axiom.getConcepts()]
+            first, first_complete = converted[0]
+            for other, other_complete in converted[1:]:
+                axioms.extend(make_equivalence_axioms(first, other, first_complete, other_complete))
+
+    concept_names = [format_name(concept_name) for concept_name in ontology.getConceptNames()]
+    return TBox(axioms, concept_names)
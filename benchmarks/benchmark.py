@@ -0,0 +1,188 @@
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from compiled_ontology import compile_ontology
+from el_reasoner import ELReasoner, ENGINES
+from instrumentation import Instrumentation
+from owl_loader import load_tbox
+
+# Benchmark harness: runs every workload on every ontology in a process of its own (so that the peak RSS of the
+# process belongs to that workload), writes the results as JSON, and compares them with a stored baseline.
+# Run "python benchmarks/benchmark.py" to compare with benchmarks/baseline.json, and add --update-baseline to
+# store the results as the new baseline (timings depend on the machine, so the baseline has to be recorded on the
+# machine it is compared on).
+
+WORKLOADS = ["load", "normalization", "query", "classification"]
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+METRICS = ["wall_time", "peak_rss", "rule_firings", "gateway_round_trips"]
+
+
+def default_ontologies():
+    return sorted(glob.glob(os.path.join(ROOT, "ontologies", "*"))) + \
+        [os.path.join(ROOT, "pizza.owl"), os.path.join(ROOT, "smoothie.owl")]
+
+
+def rule_firings(reasoner):
+    # The number of rule applications that derived something: every concept assigned to an individual (except its
+    # initial concept) and every role was derived by exactly one of them
+    firings = 0
+    for ind in reasoner.individuals.values():
+        firings += len(ind.concepts) - 1 + sum(1 for _ in ind.iter_roles())
+    return firings
+
+
+def run_workload(ontology_file, workload, backend, engine):
+    # Function to run one workload in this process and return its metrics. Only the workload itself is timed, the
+    # steps it depends on (e.g. loading for classification) are not.
+    instrumentation = Instrumentation()
+    start = time.perf_counter()
+    tbox = load_tbox(ontology_file, backend=backend, instrumentation=instrumentation)
+    loaded = time.perf_counter()
+    firings = None
+    if workload == "load":
+        wall_time = loaded - start
+    else:
+        compiled = compile_ontology(tbox)
+        compiled_time = time.perf_counter()
+        wall_time = compiled_time - loaded
+        if workload in ("query", "classification"):
+            reasoner = ELReasoner(compiled, engine=engine)
+            if workload == "query":
+                # The class in the middle of the sorted concept names, so the query is the same in every run
+                concept_names = sorted(tbox.concept_names)
+                reasoner.get_all_subsumers(concept_names[len(concept_names) // 2])
+            else:
+                reasoner.classify()
+            wall_time = time.perf_counter() - compiled_time
+            firings = rule_firings(reasoner)
+    return {
+        "wall_time": wall_time,
+        "peak_rss": get_peak_rss(),
+        "rule_firings": firings,
+        "gateway_round_trips": instrumentation.gateway_calls,
+    }
+
+
+def get_peak_rss():
+    # Peak RSS of the current process in bytes: ru_maxrss is in bytes on macOS, and in KiB on Linux and the BSDs
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def run_in_subprocess(ontology_file, workload, backend, engine, repeat):
+    # Function to run a workload in fresh processes and keep the fastest run
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", ontology_file, workload,
+                                 "--backend", backend, "--engine", engine],
+                                stdout=subprocess.PIPE, check=True, text=True).stdout
+        result = json.loads(output)
+        if best is None or result["wall_time"] < best["wall_time"]:
+            best = result
+    return best
+
+
+def compare(results, baseline, threshold, min_time):
+    # Function to compare results with a baseline. A metric regresses if it is more than threshold (relative) above
+    # the baseline; wall times also have to be more than min_time seconds above it, as short runs are noisy.
+    # Returns the regressions as strings.
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        for metric in METRICS:
+            value, expected_value = result.get(metric), expected.get(metric)
+            if value is None or expected_value is None:
+                continue
+            if value > expected_value * (1 + threshold):
+                if metric == "wall_time" and value - expected_value <= min_time:
+                    continue
+                regressions.append("%s %s: %s (baseline %s)" % (key, metric, format_metric(metric, value),
+                                                                format_metric(metric, expected_value)))
+    return regressions
+
+
+def format_metric(metric, value):
+    if metric == "wall_time":
+        return "%.1f ms" % (value * 1000)
+    if metric == "peak_rss":
+        return "%.1f MB" % (value / 2 ** 20)
+    return str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ontologies", nargs="+", default=None,
+                        help="ontology files to benchmark (default: ontologies/*, pizza.owl and smoothie.owl)")
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--backend", choices=["native", "py4j"], default="native")
+    parser.add_argument("--engine", choices=ENGINES, default="worklist")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of every workload, the fastest is kept")
+    parser.add_argument("--output", help="file to write the results to as JSON (default: standard output)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline to compare the results with")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=1.0,
+                        help="relative increase of a metric over the baseline that counts as a regression")
+    parser.add_argument("--min-time", type=float, default=0.02,
+                        help="wall time increase in seconds below which no regression is reported")
+    parser.add_argument("--run", nargs=2, metavar=("ONTOLOGY_FILE", "WORKLOAD"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run is not None:
+        json.dump(run_workload(args.run[0], args.run[1], args.backend, args.engine), sys.stdout)
+        return
+
+    results = {}
+    for ontology_file in args.ontologies or default_ontologies():
+        for workload in args.workloads:
+            # Results are keyed by the file (relative to the repository), workload, backend and engine, so that
+            # baselines are portable
+            name = os.path.relpath(os.path.abspath(ontology_file), ROOT)
+            key = "/".join([name, workload, args.backend, args.engine])
+            results[key] = run_in_subprocess(ontology_file, workload, args.backend, args.engine, args.repeat)
+            print(key, " ".join(metric + "=" + format_metric(metric, results[key][metric]) for metric in METRICS),
+                  file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=1, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=1, sort_keys=True)
+        print()
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(baseline, file, indent=1, sort_keys=True)
+            file.write("\n")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found at", args.baseline, file=sys.stderr)
+        return
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold, args.min_time)
+    for regression in regressions:
+        print("Regression:", regression, file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print("No regressions over %g%% compared with" % (args.threshold * 100), args.baseline, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import sys
+
+
+class ConceptBitset(object):
+    # Set of concept IDs stored as the bits of a single Python int: concept c is in the set iff bit c is set.
+    # It supports the operations of set that the completion rules use, so it can be used as the label of an
+    # individual instead of a set (see the labels argument of ELReasoner). Union, intersection and difference of
+    # two bitsets are a single OR, AND or AND NOT on ints, instead of hashing every element.
+    __slots__ = ("bits",)
+
+    def __init__(self, concepts=(), bits=0):
+        self.bits = bits
+        if concepts:
+            self.update(concepts)
+
+    def add(self, concept):
+        self.bits |= 1 << concept
+
+    def discard(self, concept):
+        self.bits &= ~(1 << concept)
+
+    def update(self, concepts):
+        self.bits |= to_bits(concepts)
+
+    def difference_update(self, concepts):
+        self.bits &= ~to_bits(concepts)
+
+    def intersection(self, concepts):
+        return ConceptBitset(bits=self.bits & to_bits(concepts))
+
+    def copy(self):
+        return ConceptBitset(bits=self.bits)
+
+    def __contains__(self, concept):
+        return self.bits >> concept & 1 == 1
+
+    def __iter__(self):
+        # Iterate over the set bits in increasing order, lowest bit first
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __or__(self, other):
+        return ConceptBitset(bits=self.bits | to_bits(other))
+
+    def __and__(self, other):
+        return ConceptBitset(bits=self.bits & to_bits(other))
+
+    def __sub__(self, other):
+        return ConceptBitset(bits=self.bits & ~to_bits(other))
+
+    def __eq__(self, other):
+        if isinstance(other, ConceptBitset):
+            return self.bits == other.bits
+        if isinstance(other, (set, frozenset)):
+            return self.bits == to_bits(other)
+        return NotImplemented
+
+    __hash__ = None  # Mutable, like set
+
+    def __repr__(self):
+        return "ConceptBitset(" + repr(sorted(self)) + ")"
+
+
+def to_bits(concepts):
+    # Function to turn a bitset or any iterable of concept IDs into an int with the bits of these concepts set
+    if isinstance(concepts, ConceptBitset):
+        return concepts.bits
+    bits = 0
+    for concept in concepts:
+        bits |= 1 << concept
+    return bits
+
+
+def label_size(concepts):
+    # Function to get the memory used by the label of an individual in bytes. The concept IDs themselves are not
+    # counted for a set, as they are shared with the concept factory.
+    if isinstance(concepts, ConceptBitset):
+        return sys.getsizeof(concepts) + sys.getsizeof(concepts.bits)
+    return sys.getsizeof(concepts)
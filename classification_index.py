@@ -0,0 +1,154 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+
+# Binary file format of a classification, which is memory-mapped by the reader, so that lookups do not parse or
+# copy the file and all processes that read the same file share its pages in the page cache.
+# All integers are unsigned 32-bit little-endian, and every section starts at a multiple of 4 bytes:
+#   header:        magic "ELCI", version, number of names N, number of subsumer entries M, size of the name blob
+#   name offsets:  N + 1 offsets into the name blob; name i is blob[offsets[i]:offsets[i + 1]]
+#   name blob:     the UTF-8 encoded names, sorted (by their bytes), padded to a multiple of 4 bytes
+#   offsets:       N + 1 offsets into the subsumer IDs (CSR); the subsumers of name i are ids[offsets[i]:offsets[i + 1]]
+#   subsumer IDs:  M name IDs (indices in the name table), sorted per name
+# Since the names are sorted, a name is found by binary search, and since the subsumer IDs of a name are sorted,
+# so is a subsumer.
+
+MAGIC = b"ELCI"
+VERSION = 1
+HEADER = struct.Struct("<4sIIII")
+
+
+def padding(size):
+    return -size % 4
+
+
+def to_little_endian(values):
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def write_classification(path, classification):
+    # Function to write a classification (a dict mapping every class name to the set of its subsumers, as returned
+    # by ELReasoner.classify) to a binary index file. The file is written to a temporary file first and then
+    # renamed, so that readers never see a partially written file.
+    names = set(classification)
+    for subsumers in classification.values():
+        names.update(subsumers)
+    encoded_names = sorted(name.encode("utf-8") for name in names)
+    ids = {name.decode("utf-8"): i for i, name in enumerate(encoded_names)}
+
+    name_offsets = array("I", [0])
+    for name in encoded_names:
+        name_offsets.append(name_offsets[-1] + len(name))
+    name_blob = b"".join(encoded_names)
+    offsets = array("I", [0])
+    subsumer_ids = array("I")
+    for name in encoded_names:
+        subsumer_ids.extend(sorted(ids[subsumer] for subsumer in classification.get(name.decode("utf-8"), ())))
+        offsets.append(len(subsumer_ids))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(encoded_names), len(subsumer_ids), len(name_blob)))
+            file.write(to_little_endian(name_offsets).tobytes())
+            file.write(name_blob + b"\0" * padding(len(name_blob)))
+            file.write(to_little_endian(offsets).tobytes())
+            file.write(to_little_endian(subsumer_ids).tobytes())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+class ClassificationIndex(object):
+    # Reader of a classification written by write_classification. The file is memory-mapped, and its arrays are
+    # read through memoryviews on the mapping, so opening an index costs the same for any size of classification.
+    # Usable as a context manager, which closes the mapping.
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise ValueError("Classification indexes can only be memory-mapped on little-endian machines")
+        with open(path, "rb") as file:
+            self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, size, entries, blob_size = HEADER.unpack_from(self.mapping, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not a classification index (version " + str(VERSION) + "): " + path)
+            if HEADER.size + 8 * (size + 1) + blob_size + padding(blob_size) + 4 * entries > len(self.mapping):
+                raise ValueError("Truncated classification index: " + path)
+            view = memoryview(self.mapping)
+            position = HEADER.size
+            self.name_offsets = view[position:position + 4 * (size + 1)].cast("I")
+            position += 4 * (size + 1)
+            self.name_blob = view[position:position + blob_size]
+            position += blob_size + padding(blob_size)
+            self.offsets = view[position:position + 4 * (size + 1)].cast("I")
+            position += 4 * (size + 1)
+            self.subsumer_ids = view[position:position + 4 * entries].cast("I")
+            view.release()
+        except BaseException:
+            self.close()
+            raise
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        # The memoryviews have to be released before the mapping can be closed
+        for attribute in ("name_offsets", "name_blob", "offsets", "subsumer_ids"):
+            view = self.__dict__.pop(attribute, None)
+            if view is not None:
+                view.release()
+        self.mapping.close()
+
+    def get_name_bytes(self, name_id):
+        return bytes(self.name_blob[self.name_offsets[name_id]:self.name_offsets[name_id + 1]])
+
+    def get_name(self, name_id):
+        return str(self.name_blob[self.name_offsets[name_id]:self.name_offsets[name_id + 1]], "utf-8")
+
+    def get_id(self, name):
+        # Function to find the ID of a name by binary search over the sorted name table. Returns None if the name
+        # is not in the index.
+        key = name.encode("utf-8")
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_name_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self.get_name_bytes(low) == key:
+            return low
+        return None
+
+    def get_subsumer_ids(self, name):
+        # The subsumer IDs of a class, as a memoryview on the mapping (empty if the class is not in the index)
+        name_id = self.get_id(name)
+        if name_id is None:
+            return self.subsumer_ids[0:0]
+        return self.subsumer_ids[self.offsets[name_id]:self.offsets[name_id + 1]]
+
+    def subsumers(self, name):
+        return {self.get_name(subsumer) for subsumer in self.get_subsumer_ids(name)}
+
+    def is_subsumed(self, name, subsumer_name):
+        subsumer = self.get_id(subsumer_name)
+        if subsumer is None:
+            return False
+        subsumer_ids = self.get_subsumer_ids(name)
+        i = bisect_left(subsumer_ids, subsumer)
+        return i < len(subsumer_ids) and subsumer_ids[i] == subsumer
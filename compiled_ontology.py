@@ -0,0 +1,165 @@
+from axioms import TBox, EquivalenceAxiom, load_tbox_from_gateway
+from axiom_index import AxiomIndex
+from concept_factory import ConceptFactory, CONJUNCTION
+from normal_form import normalize_axiom, define_concept, collect_subconcepts
+
+
+def extract_relevant_concepts(factory, lhs, rhs):
+    # Function to extract the relevant concepts of an axiom
+    # A relevant concept is one that appears in the input (ontology)
+    # Nested concepts are also included
+
+    relevant_concepts = set()
+
+    # Include nested concepts by recursively collecting from the LHS and RHS
+    def extract_nested_concepts(concept):
+        if factory.kinds[concept] == CONJUNCTION:
+            for sub_concept in factory.conjuncts[concept]:
+                relevant_concepts.add(sub_concept)
+                extract_nested_concepts(sub_concept)  # Recursively add nested concepts
+
+    relevant_concepts.add(lhs)
+    relevant_concepts.add(rhs)
+    extract_nested_concepts(lhs)
+    extract_nested_concepts(rhs)
+
+    return relevant_concepts
+
+
+class CompiledOntology(object):
+    # Everything the reasoner derives from the TBox before it starts the completion: the (binarized) TBox itself,
+    # the concept factory with the IDs of all its subconcepts, the axioms over these IDs, their normal form (see
+    # normal_form.py) in the rule tables used by the completion rules, and the relevant concepts.
+    # A compiled ontology does not depend on any query, so it is the unit that is cached on disk (see
+    # ontology_cache.py), extracted for modules (see module_extraction.py) and shared between reasoners and worker
+    # processes. Axioms can be added and removed afterwards, which updates all of the above.
+    # Concepts can also be declared relevant without occurring in an axiom (see module_extraction.py).
+    def __init__(self, tbox, declared_concepts=()):
+        self.tbox = tbox
+        self.factory = ConceptFactory()
+        self.inclusions = []  # (lhs, rhs) of every GCI
+        self.equivalences = []  # (lhs, rhs) of every equivalence axiom
+        self.relevance_counts = {}  # Maps every relevant concept to the number of axioms it is relevant for
+        self.occurrence_counts = {}  # Maps every conjunction and existential to the number of its occurrences
+        self.index = AxiomIndex(self.factory)
+        self.relevant_concepts = self.index.relevant
+        for axiom in tbox.axioms:
+            self.add_axiom_ids(self.get_axiom_ids(axiom))
+        for concept in declared_concepts:
+            self.declare_concept(self.factory.get_id(concept))
+        self.index.get_told_closure()  # Computed here, so that it is cached on disk with the compiled ontology
+
+    def get_axiom_ids(self, axiom):
+        # Function to turn an axiom into the triple (lhs, rhs, is_equivalence) over concept IDs
+        return self.factory.get_id(axiom.lhs), self.factory.get_id(axiom.rhs), isinstance(axiom, EquivalenceAxiom)
+
+    def add_axiom_ids(self, axiom_ids):
+        # Function to add an axiom given as a triple (lhs, rhs, is_equivalence). Returns the normal form axioms that
+        # were added to the rule tables because of it.
+        lhs, rhs, is_equivalence = axiom_ids
+        if is_equivalence:
+            self.equivalences.append((lhs, rhs))
+        else:
+            self.inclusions.append((lhs, rhs))
+        self.add_relevance(extract_relevant_concepts(self.factory, lhs, rhs))
+        normal_form = normalize_axiom(lhs, rhs, is_equivalence)
+        normal_form.extend(self.add_occurrences((lhs, rhs)))
+        self.add_normal_form(normal_form)
+        return normal_form
+
+    def declare_concept(self, concept):
+        # Function to declare a concept relevant, as if it occurred in an axiom. Returns the normal form axioms that
+        # were added to the rule tables because of it.
+        self.add_relevance(extract_relevant_concepts(self.factory, concept, concept))
+        normal_form = self.add_occurrences((concept,))
+        self.add_normal_form(normal_form)
+        return normal_form
+
+    def add_normal_form(self, normal_form):
+        self.index.ensure_size(len(self.factory))
+        for axiom in normal_form:
+            self.index.add(axiom)
+
+    def add_relevance(self, concepts):
+        # Function to count one more reason for the concepts to be relevant
+        for concept in concepts:
+            count = self.relevance_counts.get(concept, 0)
+            self.relevance_counts[concept] = count + 1
+            if count == 0:
+                self.relevant_concepts.add(concept)
+
+    def add_occurrences(self, concepts):
+        # Function to count one more occurrence of the conjunctions and existentials among the concepts and their
+        # subconcepts. Returns the normal form axioms that define those that did not occur before.
+        definitions = []
+        for concept in collect_subconcepts(self.factory, concepts):
+            count = self.occurrence_counts.get(concept, 0)
+            self.occurrence_counts[concept] = count + 1
+            if count == 0:
+                definitions.extend(define_concept(self.factory, concept))
+        return definitions
+
+    def remove_axiom_ids(self, axiom_ids):
+        # Function to remove an axiom given as a triple (lhs, rhs, is_equivalence). Returns the normal form axioms
+        # that were removed from the rule tables because of it.
+        lhs, rhs, is_equivalence = axiom_ids
+        if is_equivalence:
+            self.equivalences.remove((lhs, rhs))
+        else:
+            self.inclusions.remove((lhs, rhs))
+        for concept in extract_relevant_concepts(self.factory, lhs, rhs):
+            count = self.relevance_counts[concept] - 1
+            if count == 0:
+                del self.relevance_counts[concept]
+                self.relevant_concepts.discard(concept)
+            else:
+                self.relevance_counts[concept] = count
+        normal_form = normalize_axiom(lhs, rhs, is_equivalence)
+        for concept in collect_subconcepts(self.factory, (lhs, rhs)):
+            count = self.occurrence_counts[concept] - 1
+            if count == 0:
+                del self.occurrence_counts[concept]
+                normal_form.extend(define_concept(self.factory, concept))
+            else:
+                self.occurrence_counts[concept] = count
+        for axiom in normal_form:
+            self.index.remove(axiom)
+        return normal_form
+
+    def get_removed_normal_form(self, axioms_ids):
+        # Function to compute which normal form axioms would be removed from the rule tables if the given axioms
+        # were removed, without removing them
+        normal_form = []
+        counts = {}
+        for lhs, rhs, is_equivalence in axioms_ids:
+            normal_form.extend(normalize_axiom(lhs, rhs, is_equivalence))
+            for concept in collect_subconcepts(self.factory, (lhs, rhs)):
+                counts[concept] = counts.get(concept, 0) + 1
+        for concept, count in counts.items():
+            if self.occurrence_counts[concept] == count:
+                normal_form.extend(define_concept(self.factory, concept))
+        return normal_form
+
+    def has_axiom_ids(self, axiom_ids):
+        lhs, rhs, is_equivalence = axiom_ids
+        return (lhs, rhs) in (self.equivalences if is_equivalence else self.inclusions)
+
+    def add_axiom(self, axiom):
+        # Function to add an axiom of the native axiom model to the compiled ontology (and to its TBox)
+        self.tbox.add_axiom(axiom)
+        return self.add_axiom_ids(self.get_axiom_ids(axiom))
+
+    def remove_axiom(self, axiom):
+        # Function to remove an axiom of the native axiom model from the compiled ontology (and from its TBox)
+        self.tbox.remove_axiom(axiom)
+        return self.remove_axiom_ids(self.get_axiom_ids(axiom))
+
+
+def compile_ontology(ontology, formatter=None):
+    # Function to compile an ontology given as a compiled ontology, a native TBox or an ontology parsed by dl4python.
+    # In the latter case, the TBox is copied over the gateway once, and all completion rules run on the copy.
+    if isinstance(ontology, CompiledOntology):
+        return ontology
+    if not isinstance(ontology, TBox):
+        ontology = load_tbox_from_gateway(ontology, formatter)
+    return CompiledOntology(ontology)
@@ -0,0 +1,103 @@
+from axioms import TOP, ConceptName, TopConcept, ConceptConjunction, ExistentialRoleRestriction
+
+# Kinds of concepts
+CONCEPT_NAME = 0
+TOP_CONCEPT = 1
+CONJUNCTION = 2
+EXISTENTIAL = 3
+
+TOP_ID = 0
+
+
+class ConceptFactory(object):
+    # Hash-conses concepts into integer IDs: every distinct (sub)concept gets exactly one ID, so the completion
+    # rules can work on ints instead of concept objects or strings. For every ID, the factory keeps its kind and
+    # links to its parts: the two conjuncts of a conjunction, and the role and filler of an existential restriction.
+    # Roles are interned into integer IDs as well.
+    def __init__(self):
+        self.kinds = []
+        self.names = []  # Name of a concept name, None for other kinds of concepts
+        self.conjuncts = []  # (left, right) of a conjunction, None for other kinds of concepts
+        self.roles = []  # Role ID of an existential restriction, None for other kinds of concepts
+        self.fillers = []  # Filler of an existential restriction, None for other kinds of concepts
+
+        self.name_ids = {}
+        self.conjunction_ids = {}  # Maps (left, right) to the ID of the conjunction left ⊓ right
+        self.existential_ids = {}  # Maps (role, filler) to the ID of the existential restriction ∃role.filler
+
+        self.role_names = []
+        self.role_ids = {}
+
+        self.new_concept(TOP_CONCEPT)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def new_concept(self, kind, name=None, conjuncts=None, role=None, filler=None):
+        self.kinds.append(kind)
+        self.names.append(name)
+        self.conjuncts.append(conjuncts)
+        self.roles.append(role)
+        self.fillers.append(filler)
+        return len(self.kinds) - 1
+
+    def get_role_id(self, role_name):
+        role = self.role_ids.get(role_name)
+        if role is None:
+            role = len(self.role_names)
+            self.role_names.append(role_name)
+            self.role_ids[role_name] = role
+        return role
+
+    def get_name_id(self, name):
+        concept = self.name_ids.get(name)
+        if concept is None:
+            concept = self.new_concept(CONCEPT_NAME, name=name)
+            self.name_ids[name] = concept
+        return concept
+
+    def get_conjunction_id(self, left, right):
+        concept = self.conjunction_ids.get((left, right))
+        if concept is None:
+            concept = self.new_concept(CONJUNCTION, conjuncts=(left, right))
+            self.conjunction_ids[(left, right)] = concept
+        return concept
+
+    def get_existential_id(self, role, filler):
+        concept = self.existential_ids.get((role, filler))
+        if concept is None:
+            concept = self.new_concept(EXISTENTIAL, role=role, filler=filler)
+            self.existential_ids[(role, filler)] = concept
+        return concept
+
+    def get_id(self, concept):
+        # Function to get the ID of a concept of the native concept model, creating IDs for it and all its
+        # subconcepts if necessary. Conjunctions with more than two conjuncts are binarized on the fly.
+        if isinstance(concept, ConceptName):
+            return self.get_name_id(concept.name)
+        if isinstance(concept, TopConcept):
+            return TOP_ID
+        if isinstance(concept, ConceptConjunction):
+            conjunct_ids = [self.get_id(conjunct) for conjunct in concept.conjuncts]
+            conjunction = conjunct_ids[-1]
+            for conjunct in reversed(conjunct_ids[:-1]):
+                conjunction = self.get_conjunction_id(conjunct, conjunction)
+            return conjunction
+        if isinstance(concept, ExistentialRoleRestriction):
+            return self.get_existential_id(self.get_role_id(concept.role), self.get_id(concept.filler))
+        raise TypeError("Not an EL concept: " + repr(concept))
+
+    def get_concept(self, concept):
+        # Function to turn an ID back into a concept of the native concept model
+        kind = self.kinds[concept]
+        if kind == CONCEPT_NAME:
+            return ConceptName(self.names[concept])
+        if kind == TOP_CONCEPT:
+            return TOP
+        if kind == CONJUNCTION:
+            left, right = self.conjuncts[concept]
+            return ConceptConjunction((self.get_concept(left), self.get_concept(right)))
+        return ExistentialRoleRestriction(self.role_names[self.roles[concept]], self.get_concept(self.fillers[concept]))
+
+    def to_string(self, concept):
+        return str(self.get_concept(concept))
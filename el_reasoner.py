@@ -1,313 +1,361 @@
-import copy
-import re
+import itertools
+import time
 
+from axioms import binary_conjunctions
+from bitset import ConceptBitset, label_size
+from compiled_ontology import compile_ontology
+from concept_factory import TOP_ID, CONCEPT_NAME, EXISTENTIAL
 from individual import Individual
-from roles import Role
+from instrumentation import Instrumentation
+from saturation import WorklistEngine
+from taxonomy import build_taxonomy
 
-
-def extract_relation_and_successor(expression):
-    # Function to extract relation and successor from an existential restriction
-    # If expression looks like: ∃r.C, this function should return r, C
-
-    # Remove double quotes if present
-    exp = expression.replace('"', '')
-    # Regular expression to match ∃r.C where r is the relation and C is the successor
-    match = re.match(r"∃([\w]+)\.(.+)", exp)
-    if match:
-        relation = match.group(1)
-        successor = match.group(2)
-        return relation, successor
-    return None, None
+ENGINES = ["worklist", "naive"]
+LABELS = ["set", "bitset"]
 
 
 class ELReasoner:
-    def __init__(self, ontology, formatter, debug=False):
-        self.ontology = ontology
-        self.formatter = formatter
+    def __init__(self, ontology, formatter=None, debug=False, engine="worklist", labels="set", instrumentation=None):
+        # The ontology is either a compiled ontology, a native TBox, or an ontology parsed by dl4python.
+        # The engine is either "worklist" (see saturation.py) or "naive", which applies all completion rules to all
+        # individuals until nothing changes.
+        # The labels (the concepts assigned to the individuals) are either sets of concept IDs, or bitsets over the
+        # concept IDs (see bitset.py).
+        # If an Instrumentation is given, the reasoner records its rule applications in it (see instrumentation.py).
+        # In debug mode, the reasoner always records them, and prints a summary after every completion.
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine: " + str(engine))
+        if labels not in LABELS:
+            raise ValueError("Unknown labels: " + str(labels))
+        self.ontology = compile_ontology(ontology, formatter)
+        self.tbox = self.ontology.tbox
+        self.factory = self.ontology.factory
         self.individuals = {}  # Dictionary mapping individuals to their concepts and roles.
-        self.relevant_concepts = self.extract_relevant_concepts()
+        self.individuals_by_initial_concept = {}  # Dictionary mapping concepts to the individual they initialize
+        self.next_individual_id = 0  # Number of the next individual created by the reasoner (d0, d1, ...)
+        self.index = self.ontology.index
+        self.relevant_concepts = self.index.relevant
         self.debug = debug
+        if debug and instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        self.new_label = set if labels == "set" else ConceptBitset
+        self.concept_name_mask = None  # (number of concepts in the factory, bitset of all concept names)
+        self.engine = WorklistEngine(self) if engine == "worklist" else None
         self.visualize_ontology()
 
     def visualize_ontology(self):
         # Function to print ontology axioms for debugging purposes
         if not self.debug:
             return
-        axioms = self.ontology.tbox().getAxioms()
         print("Ontlogy:")
-        for axiom in axioms:
-            print(self.formatter.format(axiom))
+        for axiom in self.tbox.axioms:
+            print(axiom)
         print()
 
-    def extract_relevant_concepts(self):
-        # Function to extract relevant concepts
-        # A relevant concept is one that appears in the input (ontology)
-        # Nested concepts are also included
-
-        relevant_concepts = set()
-
-        # Gather all concepts from the TBox axioms (both LHS and RHS)
-        for axiom in self.ontology.tbox().getAxioms():
-            try:
-                lhs, rhs = self.extract_lhs_rhs_from_axiom(axiom)
-                relevant_concepts.add(lhs)
-                relevant_concepts.add(rhs)
-            except Exception:
-                continue
-
-        # Include nested concepts by recursively collecting from the LHS and RHS
-        def extract_nested_concepts(concept):
-            if '⊓' in concept or ' n ' in concept:
-                conjunction_op = '⊓'
-                if ' n ' in concept:
-                    conjunction_op = ' n '
-                expression = concept.strip('()')
-                left, right = expression.split(conjunction_op, 1)
-                subconcepts = [left.strip(), right.strip()]
-                for sub_concept in subconcepts:
-                    relevant_concepts.add(sub_concept)
-                    extract_nested_concepts(sub_concept)  # Recursively add nested concepts
-
-        # Check for nested concepts in the TBox
-        for axiom in self.ontology.tbox().getAxioms():
-            try:
-                lhs, rhs = self.extract_lhs_rhs_from_axiom(axiom)
-                # Add nested concepts
-                extract_nested_concepts(lhs)
-                extract_nested_concepts(rhs)
-            except Exception:
-                continue
-
-        return [concept.replace('"', '') for concept in relevant_concepts]
-
     def is_relevant(self, concept):
         return concept in self.relevant_concepts
 
+    def is_reported(self, concept):
+        # Whether a concept assigned to an individual is reported as a subsumer: concept names, and the relevant
+        # existentials. ⊤ and conjunctions are left out, and so are existentials that only occur nested in the
+        # filler of another existential, which the normal form defines as well.
+        kind = self.factory.kinds[concept]
+        return kind == CONCEPT_NAME or (kind == EXISTENTIAL and concept in self.relevant_concepts)
+
     def initialize_individual(self, d0, C0):
         # Function to initialize and individual d0 with initial Concept C0 assigned
-        new_individual = Individual(d0)
+        self.index.ensure_size(len(self.factory))  # C0 may be a concept name that does not occur in the ontology
+        new_individual = Individual(d0, self.new_label())
         new_individual.initial_concept = C0
         new_individual.concepts.add(C0)
         self.individuals[d0] = new_individual
+        self.individuals_by_initial_concept.setdefault(C0, new_individual)
+
+    def new_individual(self, C0):
+        # Function to initialize a new individual with initial concept C0 under a fresh name. Names are allocated
+        # from a counter, so they never collide, even if individuals were added with initialize_individual.
+        name = "d" + str(self.next_individual_id)
+        while name in self.individuals:
+            self.next_individual_id += 1
+            name = "d" + str(self.next_individual_id)
+        self.next_individual_id += 1
+        self.initialize_individual(name, C0)
+        return self.individuals[name]
 
-    def extract_lhs_rhs_from_axiom(self, axiom):
-        # Function to extrac lhs (left hand side) and rhs (right hand side) from an axiom
-        # For example, if the axiom is 'C≡D', it would return C,D
-        try:
-            lhs = self.formatter.format(axiom.lhs())
-            clean_lhs = lhs.replace('"', '')
-            rhs = self.formatter.format(axiom.rhs())
-            clean_rhs = rhs.replace('"', '')
-            return clean_lhs.strip(), clean_rhs.strip()
-        except Exception:
-            operators = ["⊑", "≡", "<=", "="]
-            for op in operators:
-                if op in axiom.toString():
-                    lhs, rhs = axiom.toString().split(op, 1)
-                    clean_lhs = lhs.replace('"', '')
-                    clean_rhs = rhs.replace('"', '')
-                    return clean_lhs.strip(), clean_rhs.strip()
+    def get_individual(self, concept):
+        # Function to get the individual with a concept as initial concept. A new individual is initialized if there
+        # is none yet. Individuals are never reset, so the completion graph (and everything derived in it) is shared
+        # by all queries on this reasoner.
+        ind = self.individuals_by_initial_concept.get(concept)
+        if ind is None:
+            ind = self.new_individual(concept)
+        return ind
 
     def run_completion(self):
         # Function to iteratively apply all completion rules on all individuals until no further changes can be made
+        if self.engine is not None:
+            self.engine.saturate()
+        else:
+            for _ in self.naive_steps():
+                pass
+        if self.debug:
+            self.instrumentation.report()
+            self.report_label_size()
+
+    def naive_steps(self):
+        # Generator that applies the completion rules until nothing changes, and yields after every rule application
+        # that changed something
+        rules = [self.top_rule, self.told_closure_rule, self.concept_inclusion_rule, self.conjunction_rule,
+                 self.existential_rule_1, self.existential_rule_2]
+        instrumentation = self.instrumentation
         changes = True
         while changes:
             changes = False
-            if self.top_rule(): changes = True
-            if self.conjunction_rule_1(): changes = True
-            if self.conjunction_rule_2(): changes = True
-            if self.existential_rule_1(): changes = True
-            if self.existential_rule_2(): changes = True
-            if self.concept_inclusion_rule(): changes = True
-            if self.process_t_box(): changes = True
+            for rule in rules:
+                if instrumentation is None:
+                    changed = rule()
+                else:
+                    changed = self.apply_instrumented(rule)
+                if changed:
+                    changes = True
+                    yield
+            if instrumentation is not None:
+                instrumentation.iterations += 1
+                instrumentation.sample_growth(self.individuals)
+
+    def apply_instrumented(self, rule):
+        # Function to apply a rule of the naive engine and record the application in the instrumentation
+        facts = self.count_facts()
+        start = time.perf_counter()
+        changed = rule()
+        end = time.perf_counter()
+        self.instrumentation.rule_applied(rule.__name__, start, end, changed, self.count_facts() - facts)
+        return changed
+
+    def count_facts(self):
+        # Function to count the concepts and roles assigned to all individuals
+        facts = 0
+        for ind in self.individuals.values():
+            facts += len(ind.concepts) + sum(1 for _ in ind.iter_roles())
+        return facts
+
+    def completion_steps(self):
+        # Generator that runs the completion in small steps, yielding after each one, so that callers can look at
+        # the completion graph while it is being saturated and stop early. Facts that are not processed yet when the
+        # generator is closed are processed by the next completion.
+        return self.engine.steps() if self.engine is not None else self.naive_steps()
+
+    def report_label_size(self):
+        # Function to print the memory used by the labels of the individuals, for debugging purposes
+        if not self.individuals:
+            return
+        total = sum(label_size(ind.concepts) for ind in self.individuals.values())
+        print("Labels of", len(self.individuals), "individuals use", total, "bytes,",
+              "%.1f bytes per individual" % (total / len(self.individuals)))
+
+    def add_axioms(self, axioms):
+        # Function to add axioms (of the native axiom model) to the ontology without starting the completion from
+        # scratch. Everything derived so far stays valid, so the worklist engine only processes the facts that are
+        # affected by the new axioms, and the naive engine just continues from the current completion graph.
+        # Note that the compiled ontology of the reasoner is changed as well.
+        added_axioms = []
+        for axiom in axioms:
+            axiom = type(axiom)(binary_conjunctions(axiom.lhs), binary_conjunctions(axiom.rhs))
+            added_axioms.extend(self.ontology.add_axiom(axiom))
+        if self.engine is not None:
+            self.engine.reseed(added_axioms)
+        self.run_completion()
+
+    def remove_axioms(self, axioms):
+        # Function to remove axioms (of the native axiom model) from the ontology without starting the completion
+        # from scratch. The worklist engine deletes the facts that depend on the removed axioms and derives those that
+        # still follow again (see WorklistEngine.overdelete). The naive engine resets all individuals to their initial
+        # concepts and completes them again.
+        axioms = [type(axiom)(binary_conjunctions(axiom.lhs), binary_conjunctions(axiom.rhs)) for axiom in axioms]
+        removed_axioms = [self.ontology.get_axiom_ids(axiom) for axiom in axioms]
+        for axiom, axiom_ids in zip(axioms, removed_axioms):
+            if not self.ontology.has_axiom_ids(axiom_ids):
+                raise ValueError("Axiom is not in the ontology: " + str(axiom))
+
+        affected_individuals = set()
+        if self.engine is not None:
+            # Facts left on the queue by a completion that stopped early (is_subsumed_by, iter_subsumers) are
+            # processed first: overdelete only follows the rule applications of facts that have been processed, so
+            # a queued fact would survive the deletion of its concept and derive its consequences again
+            self.engine.saturate()
+            affected_individuals = self.engine.overdelete(self.ontology.get_removed_normal_form(removed_axioms))
+        for axiom in axioms:
+            self.ontology.remove_axiom(axiom)
+        if self.engine is not None:
+            self.engine.rederive(affected_individuals)
+        else:
+            for ind in self.individuals.values():
+                ind.concepts = self.new_label((ind.initial_concept,))
+                ind.clear_roles()
+        self.run_completion()
+
+    # The naive engine applies every rule to every individual until nothing changes. The rules apply the normal form
+    # axioms (see normal_form.py), looked up in the rule tables of the index.
 
     def top_rule(self):
         # Function to add concept ⊤ to all individuals
         changed = False
-        for ind_name, ind in self.individuals.items():
-            if "⊤" not in ind.concepts:
-                self.individuals[ind_name].concepts.add("⊤")
-                print("Added concept ⊤ to individual", ind_name) if self.debug else None
+        for ind in self.individuals.values():
+            if TOP_ID not in ind.concepts:
+                ind.concepts.add(TOP_ID)
+                changed = True
+        return changed
+
+    def told_closure_rule(self):
+        # If d has a concept name A assigned, assign all concept names that subsume A in the told hierarchy to d
+        changed = False
+        told_closure = self.index.get_told_closure()
+        for ind in self.individuals.values():
+            new_concepts = self.new_label()
+            for concept in ind.concepts:
+                new_concepts.update(told_closure.get(concept, ()))
+            if new_concepts - ind.concepts:
+                ind.concepts.update(new_concepts)
                 changed = True
         return changed
 
-    def conjunction_rule_1(self):
-        # If d has C⊓D assigned, assign C and D to d
+    def concept_inclusion_rule(self):
+        # If d has A assigned and A ⊑ B, then also assign B to d
         changed = False
-        new_concepts = set()
-        for ind_name, ind in self.individuals.items():
+        told_superclasses = self.index.told_superclasses
+        for ind in self.individuals.values():
+            new_concepts = self.new_label()
             for concept in ind.concepts:
-                if '⊓' in concept or ' n ' in concept:
-                    print("Found conjunction: ", concept) if self.debug else None
-                    conjunction_op = '⊓'
-                    if ' n ' in concept:
-                        conjunction_op = ' n '
-                    expression = concept.strip('()')
-                    left, right = expression.split(conjunction_op, 1)
-                    parts = [left.strip(), right.strip()]
-                    for part in parts:
-                        clean_part = part.replace('"', '')
-                        if self.is_relevant(part):
-                            new_concepts.add(clean_part)
+                superclasses = told_superclasses[concept]
+                if superclasses is not None:
+                    new_concepts.update(superclasses)
             if new_concepts - ind.concepts:
-                self.individuals[ind_name].concepts.update(new_concepts)
-                print("Added these concepts to individual", ind_name, ":", new_concepts) if self.debug else None
+                ind.concepts.update(new_concepts)
                 changed = True
         return changed
 
-    def conjunction_rule_2(self):
-        # If d has C and D assigned, assign also C⊓D to d.
+    def conjunction_rule(self):
+        # If d has A1 and A2 assigned and A1 ⊓ A2 ⊑ B, then also assign B to d
         changed = False
-        for ind_name, ind in self.individuals.items():
+        conjunctions_by_conjunct = self.index.conjunctions_by_conjunct
+        for ind in self.individuals.values():
             concepts = ind.concepts
-            for c1 in concepts:
-                for c2 in concepts:
-                    conjunction = c1 + "⊓" + c2
-                    if c1 != c2 and self.is_relevant(conjunction) and conjunction not in concepts:
-                        print("Found 2 concepts: ", c1, c2) if self.debug else None
-                        self.individuals[ind_name].concepts.add(conjunction)
-                        print("Added this concept to individual", ind_name, ":", conjunction) if self.debug else None
+            for concept in list(concepts):
+                for other, conclusion in conjunctions_by_conjunct[concept] or ():
+                    if other in concepts and conclusion not in concepts:
+                        concepts.add(conclusion)
                         changed = True
         return changed
 
     def existential_rule_1(self):
-        # If individual d has ∃r.C assigned, check whether there exists another individual whose initial concept
-        # matches the target concept C. If such an individual is found, make it the r-successor of d by creating
-        # a role between the two and adding it to d.
-        # If no matching individual is found, create a new individual with the target concept C as its initial concept,
-        # and make it an r-successor of d.
+        # If individual d has A assigned and A ⊑ ∃r.B, look up the individual whose initial concept is B. If there is
+        # one, make it the r-successor of d by adding a role between the two to d. If there is none, create a new
+        # individual with B as its initial concept, and make it an r-successor of d.
+        # The existentials are collected before any role is added, so individuals created in this pass are only
+        # considered in the next one.
         changed = False
-        individuals_copy = copy.deepcopy(self.individuals)
-        for ind_name, ind in list(individuals_copy.items()):
-            # For each individual, check if it has an existential concept ∃r.C
-            for concept in ind.concepts:
-                if '∃' in concept and not '⊓' in concept:
-                    print("Found existential: ", concept) if self.debug else None
-                    relation, target_concept = extract_relation_and_successor(concept)
-                    # Look for an individual with the target concept as initial concept
-                    for e_name, e_ind in self.individuals.items():
-                        if target_concept == e_ind.initial_concept:
-                            # If such an individual exists, make it the r-successor of ind
-                            role = Role(relation, e_ind)
-                            if not ind.has_role(relation, e_ind):
-                                self.individuals[ind_name].roles.add(role)
-                                print("Added this role to individual", ind_name, ":",
-                                      role.relation) if self.debug else None
-                                changed = True
-                            break
-                    else:
-                        # If no such individual is found, collect new individual data
-                        ind_count = len(self.individuals)
-                        new_ind_name = "d" + str(ind_count)
-                        new_ind = Individual(new_ind_name)
-                        new_ind.initial_concept = target_concept
-                        print("Created new individual", new_ind_name, "with initial concept",
-                              target_concept) if self.debug else None
-                        new_ind.concepts.add(target_concept)
-                        self.individuals[new_ind_name] = new_ind
-                        role = Role(relation, new_ind)
-                        self.individuals[ind_name].roles.add(role)
-                        print("Added this role to individual", ind_name, ":", role.relation) if self.debug else None
-                        changed = True
+        existentials_by_concept = self.index.existentials_by_concept
+        pending = [(ind, existentials) for ind in self.individuals.values() for concept in ind.concepts
+                   for existentials in (existentials_by_concept[concept],) if existentials is not None]
+        for ind, existentials in pending:
+            for relation, filler in existentials:
+                successor = self.individuals_by_initial_concept.get(filler)
+                if successor is None:
+                    successor = self.new_individual(filler)
+                if ind.add_role(relation, successor):
+                    changed = True
         return changed
 
     def existential_rule_2(self):
-        # If d has an r-successor with C assigned, add ∃r.C to d
+        # If d has an r-successor with A assigned and ∃r.A ⊑ B, then also assign B to d
         changed = False
-        for ind_name, ind in self.individuals.items():
-            new_concepts = set()
-            for role in ind.roles:
-                for concept in role.successor.concepts:
-                    existential_concept = "∃" + role.relation + "." + concept
-                    if self.is_relevant(existential_concept):
-                        if existential_concept not in ind.concepts:
-                            new_concepts.add(existential_concept)
-
+        existentials_by_filler = self.index.existentials_by_filler
+        for ind in self.individuals.values():
+            new_concepts = self.new_label()
+            for relation, successor in ind.iter_roles():
+                for concept in successor.concepts:
+                    for existential_relation, conclusion in existentials_by_filler[concept] or ():
+                        if existential_relation == relation:
+                            new_concepts.add(conclusion)
             if new_concepts - ind.concepts:
-                self.individuals[ind_name].concepts.update(new_concepts)
-                print("Added these concepts to individual", ind_name, ":", new_concepts) if self.debug else None
+                ind.concepts.update(new_concepts)
                 changed = True
-
         return changed
 
-    def concept_inclusion_rule(self):
-        # If d has C assigned and C ⊑ D, then also assign D to d
-        changed = False
-        for ind_name, ind in self.individuals.items():
-            ind_concepts = ind.concepts
-            new_concepts = set()  # Set to collect new concepts to add
-
-            for c in ind_concepts:
-                for axiom in self.ontology.tbox().getAxioms():
-                    axiom_type = axiom.getClass().getSimpleName()
-                    if axiom_type != "GeneralConceptInclusion":
-                        continue
-                    try:
-                        # print("Found GCI: ", axiom.toString()) if self.debug else None
-                        lhs, rhs = self.extract_lhs_rhs_from_axiom(axiom)
-                        if lhs == c and self.is_relevant(rhs):
-                            new_concepts.add(rhs)
-                    except Exception:
-                        continue
-
-            # After the loop finishes, update the individual's concepts
-            if new_concepts - ind.concepts:
-                self.individuals[ind_name].concepts.update(new_concepts)
-                print("Added this concept to individual", ind_name, ":", new_concepts) if self.debug else None
-                changed = True
+    def get_all_subsumers(self, concept_name):
+        ind = self.get_individual(self.factory.get_name_id(concept_name))
+        self.run_completion()
+        return self.clean_concepts(ind.concepts)
 
-        return changed
+    def iter_subsumers(self, concept_name):
+        # Generator that yields the subsumers of a concept name (as in get_all_subsumers) as soon as they are derived.
+        # The label of the individual only grows during the completion, so it has new concepts iff its size changed.
+        ind = self.get_individual(self.factory.get_name_id(concept_name))
+        reported = set()
+        for _ in itertools.chain([None], self.completion_steps()):
+            if len(ind.concepts) != len(reported):
+                for concept in [concept for concept in ind.concepts if concept not in reported]:
+                    reported.add(concept)
+                    if self.is_reported(concept):
+                        yield self.factory.to_string(concept)
 
-    def process_t_box(self):
-        # Apply the general concept inclusion and equivalence axioms of the ontology to propagate knowledge.
-        # Look for "GeneralConceptInclusion" and "Equivalence" axioms, and for each, extract the LHS and RHS concepts.
-        # Then, for each individual, check if the individual has the LHS concept assigned. If so, and if the RHS is
-        # relevant, add the RHS to the individual’s concepts.
-        changed = False
-        axioms = self.ontology.tbox().getAxioms()
-        for axiom in axioms:
-            axiom_type = axiom.getClass().getSimpleName()
-            if axiom_type == "GeneralConceptInclusion" or axiom_type == "EquivalenceAxiom":
-                # print("Found GCI or equivalence: ", axiom.toString()) if self.debug else None
-                try:
-                    lhs, rhs = self.extract_lhs_rhs_from_axiom(axiom)
-                    for ind_name, ind in self.individuals.items():
-                        ind_concepts = ind.concepts
-                        new_concepts = set()
-                        if lhs in ind_concepts and self.is_relevant(rhs):
-                            new_concepts.add(rhs)
-                        if new_concepts - ind.concepts:
-                            self.individuals[ind_name].concepts.update(new_concepts)
-                            changed = True
-                except Exception as e:
-                    continue
-            if axiom_type == "EquivalenceAxiom":
-                # print("Found equivalence: ", axiom.toString()) if self.debug else None
-                try:
-                    lhs, rhs = self.extract_lhs_rhs_from_axiom(axiom)
-                    for ind_name, ind in self.individuals.items():
-                        ind_concepts = ind.concepts
-                        new_concepts = set()
-                        if rhs in ind_concepts and self.is_relevant(lhs):
-                            new_concepts.add(lhs)
-                        if new_concepts - ind.concepts:
-                            self.individuals[ind_name].concepts.update(new_concepts)
-                            print("Added these concepts to individual", ind_name, ":",
-                                  new_concepts) if self.debug else None
-                            changed = True
-                except Exception:
-                    continue
-        return changed
+    def is_subsumed_by(self, concept_name, subsumer_name):
+        # Function to check whether a concept name is subsumed by another one. The completion stops as soon as the
+        # subsumer is derived, so only a part of the completion graph may be saturated when the answer is yes.
+        ind = self.get_individual(self.factory.get_name_id(concept_name))
+        subsumer = self.factory.get_name_id(subsumer_name)
+        for _ in itertools.chain([None], self.completion_steps()):
+            if subsumer in ind.concepts:
+                return True
+        return False
 
-    def get_all_subsumers(self, concept_name):
-        d0 = "d0"
-        self.initialize_individual(d0, concept_name)
+    def get_subsumers_batch(self, class_names):
+        # Function to get the subsumers of several classes at once. All classes are added to the completion graph
+        # before saturating, and only what is new since earlier queries is saturated: classes that were already
+        # queried, or that occurred as the filler of an existential of an earlier query, are answered directly.
+        individuals = {}
+        for class_name in class_names:
+            individuals[class_name] = self.get_individual(self.factory.get_name_id(class_name))
+        self.run_completion()
+        return {class_name: self.clean_concepts(ind.concepts) for class_name, ind in individuals.items()}
+
+    def classify(self, concept_names=None):
+        # Function to compute the concept name subsumers of all concept names of the ontology (or of the given ones)
+        # in one saturation. Every concept name gets an individual with that name as initial concept, and successors
+        # are shared between all of them through their initial concept, as in existential_rule_1.
+        if concept_names is None:
+            concept_names = sorted(self.tbox.concept_names)
+        individuals = {}
+        for concept_name in concept_names:
+            individuals[concept_name] = self.get_individual(self.factory.get_name_id(concept_name))
         self.run_completion()
-        return self.clean_concepts(self.individuals[d0].concepts)
+        return {concept_name: self.concept_names_of(ind.concepts) for concept_name, ind in individuals.items()}
+
+    def build_taxonomy(self, concept_names=None):
+        # Function to classify the ontology (or the given concept names) and build its taxonomy: the groups of
+        # equivalent concept names with their direct superclasses and subclasses (see taxonomy.py)
+        return build_taxonomy(self.classify(concept_names))
+
+    def concept_names_of(self, concepts):
+        # Function to get the names of the concept names among the concepts assigned to an individual. For bitset
+        # labels, the concept names are selected with a single AND with the bitset of all concept names.
+        names = self.factory.names
+        if isinstance(concepts, ConceptBitset):
+            return {names[concept] for concept in concepts & self.get_concept_name_mask()}
+        kinds = self.factory.kinds
+        return {names[concept] for concept in concepts if kinds[concept] == CONCEPT_NAME}
+
+    def get_concept_name_mask(self):
+        # The bitset of all concept names, computed again only when the factory got new concepts
+        if self.concept_name_mask is None or self.concept_name_mask[0] != len(self.factory):
+            self.concept_name_mask = (len(self.factory), ConceptBitset(self.factory.name_ids.values()))
+        return self.concept_name_mask[1]
 
     def clean_concepts(self, concepts):
+        # Function to turn the concepts assigned to an individual into the strings that are printed as subsumers
         cleaned_concepts = set()
         for concept in concepts:
-            if concept[0] not in ['⊤', '⩾', '⩽', '(']:
-                cleaned_concepts.add(concept)
-        return cleaned_concepts
\ No newline at end of file
+            if self.is_reported(concept):
+                cleaned_concepts.add(self.factory.to_string(concept))
+        return cleaned_concepts
@@ -0,0 +1,288 @@
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+# Managed dl4python gateway: instead of starting `java -jar dl4python-0.1-jar-with-dependencies.jar` by hand before
+# every run, connect_gateway starts the JVM in the background when nothing is listening, and later runs (and other
+# processes) reuse the warm JVM. The managed JVM is described by a port file (gateway.json in the cache directory,
+# see ontology_cache.get_cache_dir) with its pid and port. Every connection touches the port file, and a supervisor
+# process stops the JVM once the port file has not been touched for the idle timeout. Open connections that are
+# reused (e.g. by async_api.GatewayPool) mark the JVM as used with mark_used, and long calls over a connection keep
+# it alive with keep_alive.
+# A gateway started by hand is used as well, but is never stopped.
+# py4j is only imported when a connection is opened, so runs with the native backend or a cache hit never import it.
+#
+#     python gateway.py start | stop | status
+
+DEFAULT_JAR = "dl4python-0.1-jar-with-dependencies.jar"
+DEFAULT_PORT = 25333  # Default port of py4j, on which dl4python listens
+DEFAULT_IDLE_TIMEOUT = 600
+
+
+def get_port_file_path():
+    from ontology_cache import get_cache_dir
+
+    return os.path.join(get_cache_dir(), "gateway.json")
+
+
+def find_jar(jar=None):
+    # The jar is given, or set in $EL_REASONER_JAR, or found in the current directory or next to this file
+    jar = jar or os.environ.get("EL_REASONER_JAR")
+    if jar:
+        candidates = [jar]
+    else:
+        candidates = [DEFAULT_JAR, os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_JAR)]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    raise FileNotFoundError("dl4python jar not found: " + candidates[0] + " (set $EL_REASONER_JAR to its path)")
+
+
+def get_idle_timeout():
+    return float(os.environ.get("EL_REASONER_GATEWAY_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+
+
+def is_listening(port):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=1):
+            return True
+    except OSError:
+        return False
+
+
+def is_running(pid):
+    if os.name == "nt":
+        return is_running_on_windows(pid)  # os.kill(pid, 0) would terminate the process on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_running_on_windows(pid):
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return False
+    try:
+        exit_code = ctypes.c_ulong()
+        still_active = 259
+        return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))) and exit_code.value == still_active
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def read_port_file(port_file):
+    # Function to read the port file of the managed JVM. Returns None if there is none, or if its JVM is gone.
+    try:
+        with open(port_file, encoding="utf-8") as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or not isinstance(state.get("pid"), int) or state["pid"] <= 0:
+        return None
+    if not is_running(state["pid"]):
+        return None
+    return state
+
+
+def write_port_file(port_file, state):
+    temporary_path = port_file + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(temporary_path, port_file)
+
+
+def touch(port_file):
+    # Marks the managed JVM as used, which postpones its idle shutdown
+    try:
+        os.utime(port_file)
+    except OSError:
+        pass
+
+
+def mark_used():
+    # Function to postpone the idle shutdown of the managed JVM (nothing happens if there is none)
+    touch(get_port_file_path())
+
+
+@contextlib.contextmanager
+def keep_alive():
+    # Context manager that keeps the managed JVM from being stopped as idle while the block runs (e.g. parsing a
+    # large ontology), by touching the port file on entry, on exit and regularly in between
+    port_file = get_port_file_path()
+    interval = max(get_idle_timeout() / 4, 0.1)
+    done = threading.Event()
+
+    def touch_regularly():
+        while not done.wait(interval):
+            touch(port_file)
+
+    touch(port_file)
+    thread = threading.Thread(target=touch_regularly, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+        touch(port_file)
+
+
+def ensure_gateway(jar=None, idle_timeout=None, startup_timeout=60.0):
+    # Function to make sure that a gateway is listening, starting a managed JVM if necessary. Returns its port.
+    # The port file is locked while checking and starting, so that concurrent runs start at most one JVM.
+    port_file = get_port_file_path()
+    os.makedirs(os.path.dirname(port_file), exist_ok=True)
+    with open(port_file + ".lock", "w") as lock:
+        lock_file(lock)
+        state = read_port_file(port_file)
+        if state is not None and is_listening(state["port"]):
+            touch(port_file)
+            return state["port"]
+        if is_listening(DEFAULT_PORT):
+            return DEFAULT_PORT  # Started by hand
+        return launch_gateway(port_file, find_jar(jar), get_idle_timeout() if idle_timeout is None else idle_timeout,
+                              startup_timeout)
+
+
+def lock_file(file):
+    # Function to lock an open file exclusively until it is closed: with fcntl on POSIX, and with msvcrt on Windows
+    # (which locks its first byte)
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                pass  # LK_LOCK gives up after 10 seconds, so keep waiting for the other process
+    else:
+        fcntl.flock(file, fcntl.LOCK_EX)
+
+
+def launch_gateway(port_file, jar, idle_timeout, startup_timeout):
+    # Function to start the JVM and its supervisor in the background, in sessions of their own, so that they outlive
+    # the current process. The output of the JVM goes to gateway.log next to the port file.
+    with open(os.path.join(os.path.dirname(port_file), "gateway.log"), "ab") as log:
+        process = subprocess.Popen([os.environ.get("EL_REASONER_JAVA", "java"), "-jar", jar],
+                                   stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                                   start_new_session=True)
+    deadline = time.monotonic() + startup_timeout
+    while not is_listening(DEFAULT_PORT):
+        if process.poll() is not None:
+            raise RuntimeError("The dl4python gateway exited with code " + str(process.returncode) + " on startup")
+        if time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("The dl4python gateway did not start listening within " + str(startup_timeout) + " s")
+        time.sleep(0.1)
+    write_port_file(port_file, {"pid": process.pid, "port": DEFAULT_PORT, "jar": jar, "idle_timeout": idle_timeout})
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "supervise", port_file],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+    return DEFAULT_PORT
+
+
+def connect_gateway(jar=None, idle_timeout=None):
+    # Function to open a py4j connection to the dl4python gateway, starting a managed JVM if nothing is listening
+    from py4j.java_gateway import JavaGateway, GatewayParameters
+
+    return JavaGateway(gateway_parameters=GatewayParameters(port=ensure_gateway(jar, idle_timeout)))
+
+
+def supervise(port_file, poll_interval=5.0):
+    # Function run by the supervisor process: stops the managed JVM when the port file has not been touched for the
+    # idle timeout, and removes the port file when the JVM is gone
+    state = read_port_file(port_file)
+    if state is None:
+        return
+    pid = state["pid"]
+    while is_running(pid):
+        try:
+            idle = time.time() - os.stat(port_file).st_mtime
+        except OSError:
+            idle = float("inf")  # Port file removed: the JVM is no longer managed
+        if idle >= state["idle_timeout"]:
+            stop_process(pid)
+            break
+        time.sleep(min(poll_interval, state["idle_timeout"] - idle))
+    remove_port_file(port_file, pid)
+
+
+def stop_process(pid, timeout=10.0):
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while is_running(pid) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if is_running(pid):
+        os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))  # SIGTERM already terminates the process on Windows
+
+
+def remove_port_file(port_file, pid):
+    # The port file is only removed if it still describes the given JVM (a new one may have been started meanwhile)
+    try:
+        with open(port_file, encoding="utf-8") as file:
+            if json.load(file).get("pid") != pid:
+                return
+        os.unlink(port_file)
+    except (OSError, ValueError):
+        pass
+
+
+def stop_gateway():
+    # Function to stop the managed JVM, if there is one. Returns whether one was stopped.
+    port_file = get_port_file_path()
+    state = read_port_file(port_file)
+    if state is None:
+        return False
+    stop_process(state["pid"])
+    remove_port_file(port_file, state["pid"])
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the dl4python gateway")
+    parser.add_argument("command", choices=["start", "stop", "status", "supervise"])
+    parser.add_argument("port_file", nargs="?", help=argparse.SUPPRESS)
+    parser.add_argument("--jar", help="path of the dl4python jar (default: $EL_REASONER_JAR or " + DEFAULT_JAR + ")")
+    parser.add_argument("--idle-timeout", type=float,
+                        help="stop the gateway after this many seconds without a connection "
+                             "(default: $EL_REASONER_GATEWAY_IDLE_TIMEOUT or " + str(DEFAULT_IDLE_TIMEOUT) + ")")
+    args = parser.parse_args()
+    if args.command == "supervise":
+        supervise(args.port_file)
+    elif args.command == "start":
+        try:
+            print("Gateway listening on port", ensure_gateway(args.jar, args.idle_timeout))
+        except (OSError, RuntimeError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.command == "stop":
+        print("Gateway stopped" if stop_gateway() else "No managed gateway running")
+    else:
+        state = read_port_file(get_port_file_path())
+        if state is not None:
+            print("Managed gateway (pid " + str(state["pid"]) + ") listening on port", state["port"])
+        elif is_listening(DEFAULT_PORT):
+            print("Gateway (not managed) listening on port", DEFAULT_PORT)
+        else:
+            print("No gateway running")
+
+
+if __name__ == "__main__":
+    main()
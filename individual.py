@@ -1,15 +1,97 @@
+from roles import Role
+
+
 class Individual(object):
-    def __init__(self, name):
+    # Individuals use __slots__ instead of a __dict__ per instance, as a classification creates one for every
+    # concept name and every existential filler
+    __slots__ = ("name", "initial_concept", "concepts", "successors")
+
+    def __init__(self, name, concepts=None):
+        # The concepts are a set of concept IDs, unless another label (e.g. a ConceptBitset) is given
         self.name = name
         self.initial_concept = None
-        self.concepts = set()
-        self.roles = set()
+        self.concepts = set() if concepts is None else concepts
+        self.successors = {}  # Adjacency (see add_adjacent) mapping relations to the r-successors of the individual
+
+    @property
+    def roles(self):
+        return [Role(relation, successor) for relation, successor in self.iter_roles()]
+
+    def iter_roles(self):
+        # Function to iterate over the roles of the individual as (relation, successor) pairs
+        return iter_adjacent(self.successors)
 
     def has_role(self, relation, successor):
-        for role in self.roles:
-            if role.relation != relation:
-                continue
-            if role.successor.name == successor.name:
-                return True
+        return is_adjacent(self.successors, relation, successor)
+
+    def add_role(self, relation, successor):
+        # Function to make successor an r-successor of the individual. Returns whether it was not one already.
+        return add_adjacent(self.successors, relation, successor)
+
+    def remove_role(self, relation, successor):
+        remove_adjacent(self.successors, relation, successor)
+
+    def clear_roles(self):
+        self.successors = {}
+
+
+# An adjacency maps every relation to the individuals related by it. Most individuals have a single successor (and
+# predecessor) per relation, so such an individual is stored directly, and only two or more are stored in a set.
+
+def is_adjacent(adjacency, relation, ind):
+    adjacent = adjacency.get(relation)
+    if adjacent is None:
         return False
+    if type(adjacent) is set:
+        return ind in adjacent
+    return adjacent is ind
+
+
+def add_adjacent(adjacency, relation, ind):
+    # Function to add an individual to an adjacency. Returns whether it was not in it already.
+    adjacent = adjacency.get(relation)
+    if adjacent is None:
+        adjacency[relation] = ind
+        return True
+    if type(adjacent) is set:
+        if ind in adjacent:
+            return False
+        adjacent.add(ind)
+        return True
+    if adjacent is ind:
+        return False
+    adjacency[relation] = {adjacent, ind}
+    return True
+
+
+def remove_adjacent(adjacency, relation, ind):
+    adjacent = adjacency.get(relation)
+    if adjacent is None:
+        return
+    if type(adjacent) is set:
+        adjacent.discard(ind)
+        if len(adjacent) == 1:
+            adjacency[relation] = next(iter(adjacent))
+    elif adjacent is ind:
+        del adjacency[relation]
+
+
+def get_adjacent(adjacency, relation):
+    # Function to get the individuals adjacent over a relation, as a new collection, so that the adjacency can be
+    # changed while iterating over them
+    adjacent = adjacency.get(relation)
+    if adjacent is None:
+        return ()
+    if type(adjacent) is set:
+        return list(adjacent)
+    return (adjacent,)
+
 
+def iter_adjacent(adjacency):
+    # Function to iterate over an adjacency as (relation, individual) pairs
+    for relation, adjacent in adjacency.items():
+        if type(adjacent) is set:
+            for ind in adjacent:
+                yield relation, ind
+        else:
+            yield relation, adjacent
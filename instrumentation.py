@@ -0,0 +1,120 @@
+import json
+import time
+
+
+class Instrumentation(object):
+    # Collects what the reasoner does, to find out where the time goes:
+    # - per rule: how often it was applied, how often it changed something, how many facts it derived and how
+    #   long it took
+    # - the number of fixpoint iterations (passes over all rules of the naive engine, facts processed by the
+    #   worklist engine)
+    # - the growth of the completion graph (individuals and roles) over time
+    # - the number and latency of the calls to the py4j gateway
+    # Reasoners without instrumentation (the default) do not record anything, so that it costs (almost) nothing
+    # when disabled. The data can be exported as JSON or in the Chrome trace format (chrome://tracing, Perfetto).
+    def __init__(self):
+        self.start = time.perf_counter()
+        # Maps the name of a rule to [applications, applications that changed something, derived facts, time]
+        self.rules = {}
+        self.iterations = 0
+        self.growth = []  # (time, individuals, roles) samples
+        self.gateway_calls = 0
+        self.gateway_time = 0.0
+        self.events = []  # (name, start, duration) of every timed span, for the Chrome trace
+
+    def rule_applied(self, rule, start, end, changed=True, derived=0):
+        # Function to record an application of a rule between two time stamps (of time.perf_counter)
+        statistics = self.rules.get(rule)
+        if statistics is None:
+            statistics = self.rules[rule] = [0, 0, 0, 0.0]
+        statistics[0] += 1
+        statistics[1] += 1 if changed else 0
+        statistics[2] += derived
+        statistics[3] += end - start
+        self.events.append((rule, start, end - start))
+
+    def derived(self, rule, count=1):
+        # Function to record facts derived by a rule without timing it (used by the worklist engine, which applies
+        # rules far too often to time them one by one)
+        statistics = self.rules.get(rule)
+        if statistics is None:
+            statistics = self.rules[rule] = [0, 0, 0, 0.0]
+        statistics[0] += count
+        statistics[1] += count
+        statistics[2] += count
+
+    def processed(self, rule, count, duration):
+        # Function to record that a rule was applied count times, taking duration seconds in total (used by the
+        # worklist engine for processing concepts and roles, which applies all rules that the fact can enable)
+        statistics = self.rules.get(rule)
+        if statistics is None:
+            statistics = self.rules[rule] = [0, 0, 0, 0.0]
+        statistics[0] += count
+        statistics[3] += duration
+
+    def span(self, name, start, end):
+        # Function to record a timed span that is not a rule, e.g. a whole saturation
+        self.events.append((name, start, end - start))
+
+    def sample_growth(self, individuals):
+        roles = 0
+        for ind in individuals.values():
+            roles += sum(1 for _ in ind.iter_roles())
+        self.growth.append((time.perf_counter(), len(individuals), roles))
+
+    def instrument_gateway(self, gateway):
+        # Function to count and time every command sent to a py4j gateway
+        client = gateway._gateway_client
+        send_command = client.send_command
+
+        def timed_send_command(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return send_command(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self.gateway_calls += 1
+                self.gateway_time += end - start
+                self.events.append(("py4j", start, end - start))
+
+        client.send_command = timed_send_command
+
+    def to_json(self):
+        return {
+            "rules": {rule: {"applications": statistics[0], "changed": statistics[1], "derived": statistics[2],
+                             "time": statistics[3]}
+                      for rule, statistics in self.rules.items()},
+            "iterations": self.iterations,
+            "growth": [{"time": timestamp - self.start, "individuals": individuals, "roles": roles}
+                       for timestamp, individuals, roles in self.growth],
+            "gateway": {"calls": self.gateway_calls, "time": self.gateway_time},
+        }
+
+    def to_chrome_trace(self):
+        # Timed spans become complete events, and the growth samples become counter events
+        def microseconds(timestamp):
+            return (timestamp - self.start) * 1e6
+
+        events = [{"name": name, "ph": "X", "ts": microseconds(start), "dur": duration * 1e6, "pid": 1, "tid": 1}
+                  for name, start, duration in self.events]
+        events.extend({"name": "completion graph", "ph": "C", "ts": microseconds(timestamp), "pid": 1,
+                       "args": {"individuals": individuals, "roles": roles}}
+                      for timestamp, individuals, roles in self.growth)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path, output_format="json"):
+        data = self.to_chrome_trace() if output_format == "chrome" else self.to_json()
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=1)
+
+    def report(self):
+        # Function to print a summary, for debugging purposes
+        print("Iterations:", self.iterations)
+        for rule, (applications, changed, derived, duration) in sorted(self.rules.items()):
+            print("  %-24s %8d applications %8d changed %8d derived %9.1f ms" %
+                  (rule, applications, changed, derived, duration * 1000))
+        if self.growth:
+            _, individuals, roles = self.growth[-1]
+            print("Completion graph:", individuals, "individuals,", roles, "roles")
+        if self.gateway_calls:
+            print("py4j gateway:", self.gateway_calls, "calls,", "%.1f ms" % (self.gateway_time * 1000))
@@ -1,32 +1,152 @@
+import argparse
+import json
 import sys
-from py4j.java_gateway import JavaGateway
-from el_reasoner import ELReasoner
+import time
+from el_reasoner import ELReasoner, ENGINES, LABELS
+from ontology_cache import load_compiled_ontology, load_module
+from instrumentation import Instrumentation
+from classification_index import write_classification
+from parallel import classify_parallel
+from server import serve
+
+
+def print_classification(classification, output_format):
+    # Function to print the subsumers of all classes, either as JSON (an object mapping every class to the sorted
+    # list of its subsumers) or as TSV (one line "CLASS<tab>SUBSUMER" per subsumer)
+    if output_format == "json":
+        json.dump({name: sorted(subsumers) for name, subsumers in classification.items()}, sys.stdout, indent=1,
+                  ensure_ascii=False)
+        print()
+        return
+    for name, subsumers in classification.items():
+        for subsumer in sorted(subsumers):
+            print(name + "\t" + subsumer)
+
+
+def output_classification(classification, args):
+    # The classification is written to the binary index file if one is given, and printed otherwise
+    if args.index is not None:
+        write_classification(args.index, classification)
+    else:
+        print_classification(classification, args.format)
+
+
+def read_classes_file(classes_file):
+    # Function to read the classes to query from a file with one class name per line
+    with open(classes_file, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
 
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python main.py ONTOLOGY_FILE CLASS_NAME")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        usage="python main.py ONTOLOGY_FILE (CLASS_NAME | --all | --classes-file FILE | --check A B) [options]\n"
+              "       python main.py --serve [--socket PATH] [ONTOLOGY_FILE] [options]")
+    parser.add_argument("ontology_file", nargs="?")
+    parser.add_argument("class_name", nargs="?")
+    parser.add_argument("--all", action="store_true",
+                        help="classify the ontology: print the concept name subsumers of all concept names")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="number of worker processes used by --all")
+    parser.add_argument("--classes-file",
+                        help="print the subsumers of all classes listed in this file, one class name per line")
+    parser.add_argument("--check", nargs=2, metavar=("A", "B"),
+                        help="only check whether class A is subsumed by class B")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a daemon answering JSON queries on a unix socket (see server.py)")
+    parser.add_argument("--socket", default="/tmp/el-reasoner.sock", help="unix socket of the daemon")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="number of classes whose subsumers the daemon caches")
+    parser.add_argument("--format", choices=["tsv", "json"], default="tsv",
+                        help="output format of --all and --classes-file")
+    parser.add_argument("--index", metavar="FILE",
+                        help="write the classification of --all to FILE as a memory-mapped index instead of printing "
+                             "it (see classification_index.py)")
+    parser.add_argument("--backend", choices=["native", "py4j"], default="native",
+                        help="parse the ontology natively in Python, or with dl4python through the py4j gateway")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse the ontology, instead of loading it from the on-disk cache")
+    parser.add_argument("--no-module", action="store_true",
+                        help="reason over the whole ontology instead of the module of the queried classes")
+    parser.add_argument("--engine", choices=ENGINES, default="worklist",
+                        help="saturate with the worklist engine, or by applying all rules until nothing changes")
+    parser.add_argument("--labels", choices=LABELS, default="set",
+                        help="store the concepts of every individual in a set or in a bitset")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="record rule applications, completion graph growth and py4j calls, and write them to FILE")
+    parser.add_argument("--profile-format", choices=["json", "chrome"], default="json",
+                        help="write the profile as JSON or in the Chrome trace format")
+    args = parser.parse_args()
+    modes = [args.class_name is not None, args.all, args.classes_file is not None, args.check is not None]
+    if args.serve:
+        if modes.count(True) != 0:
+            parser.error("--serve cannot be combined with a CLASS_NAME, --all, --classes-file or --check")
+        try:
+            serve(args.socket, [args.ontology_file] if args.ontology_file else [], cache_size=args.cache_size,
+                  backend=args.backend, engine=args.engine, labels=args.labels, use_cache=not args.no_cache)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+    if args.ontology_file is None:
+        parser.error("the ONTOLOGY_FILE is required")
+    if modes.count(True) != 1:
+        parser.error("give either a CLASS_NAME, --all, --classes-file or --check")
+    if args.index is not None and not args.all:
+        parser.error("--index can only be used with --all")
+    if args.jobs > 1 and not args.all:
+        parser.error("--jobs can only be used with --all")
+    if args.jobs > 1 and args.profile:
+        parser.error("--profile cannot be combined with --jobs, as the workers are not profiled")
 
-    ontology_file = sys.argv[1]
-    class_name = sys.argv[2]
+    ontology_file = args.ontology_file
+    class_name = args.class_name
 
+    instrumentation = Instrumentation() if args.profile else None
     try:
-        gateway = JavaGateway()
-        parser = gateway.getOWLParser()
-        ontology = parser.parseFile(ontology_file)
-        gateway.convertToBinaryConjunctions(ontology)
-        formatter = gateway.getSimpleDLFormatter()
         debug = False
-        reasoner = ELReasoner(ontology, formatter, debug=debug)
-        subsumers = reasoner.get_all_subsumers(class_name)
+        class_names = None  # Classes that are queried, if not all of them
+        if args.classes_file is not None:
+            class_names = read_classes_file(args.classes_file)
+        elif args.check is not None:
+            class_names = list(args.check)
+        elif class_name is not None:
+            class_names = [class_name]
+        start = time.perf_counter()
+        if class_names is not None and not args.no_module:
+            ontology = load_module(ontology_file, class_names, backend=args.backend, use_cache=not args.no_cache,
+                                   debug=debug, instrumentation=instrumentation)
+        else:
+            ontology = load_compiled_ontology(ontology_file, backend=args.backend, use_cache=not args.no_cache,
+                                              debug=debug, instrumentation=instrumentation)
+        if instrumentation is not None:
+            instrumentation.span("load", start, time.perf_counter())
+        if args.all and args.jobs > 1:
+            classification = classify_parallel(ontology, args.jobs, engine=args.engine, labels=args.labels)
+            output_classification(classification, args)
+            return
+        reasoner = ELReasoner(ontology, debug=debug, engine=args.engine, labels=args.labels,
+                              instrumentation=instrumentation)
+        if args.all:
+            output_classification(reasoner.classify(), args)
+            return
+        if args.classes_file is not None:
+            print_classification(reasoner.get_subsumers_batch(class_names), args.format)
+            return
+        if args.check is not None:
+            sub, sup = args.check
+            print(sub + (" ⊑ " if reasoner.is_subsumed_by(sub, sup) else " ⋢ ") + sup)
+            return
+        # The subsumers are printed as soon as they are derived
         print("\nSubsumers of " + class_name + " are: ") if debug else None
-        for subsumer in subsumers:
-            print(subsumer)
+        for subsumer in reasoner.iter_subsumers(class_name):
+            print(subsumer, flush=True)
 
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        if instrumentation is not None:
+            instrumentation.write(args.profile, args.profile_format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import time
+
+from axioms import TBox, ConceptName, ConceptConjunction, ExistentialRoleRestriction, EquivalenceAxiom
+from compiled_ontology import CompiledOntology
+
+
+def collect_signature(concept, signature):
+    # Function to add the signature of a concept to a set: ("concept", A) for every concept name A, and ("role", r)
+    # for every role r occurring in it
+    if isinstance(concept, ConceptName):
+        signature.add(("concept", concept.name))
+    elif isinstance(concept, ConceptConjunction):
+        for conjunct in concept.conjuncts:
+            collect_signature(conjunct, signature)
+    elif isinstance(concept, ExistentialRoleRestriction):
+        signature.add(("role", concept.role))
+        collect_signature(concept.filler, signature)
+    return signature
+
+
+class ModuleExtractor(object):
+    # Extracts syntactic ⊥-locality modules from a TBox. An axiom is ⊥-local w.r.t. a signature Σ if it holds when
+    # every concept name and role outside Σ is interpreted as the empty set. In EL (without ⊥), a concept is empty
+    # under this interpretation iff a symbol outside Σ occurs in it, so:
+    # - C ⊑ D is not local iff sig(C) ⊆ Σ
+    # - C ≡ D is not local iff sig(C) ⊆ Σ or sig(D) ⊆ Σ
+    # The module of Σ is computed by adding non-local axioms and their signature to Σ until nothing changes. It
+    # entails the same subsumptions between concepts over Σ as the whole TBox.
+    # To find the non-local axioms quickly, every side that makes an axiom non-local (the LHS of a GCI, both sides
+    # of an equivalence axiom) counts the symbols of its signature that are not in Σ yet.
+    # The reasoner only reports the existentials that are relevant, i.e. that occur in the ontology. To report the
+    # same subsumers for the module as for the whole TBox, the concepts that are relevant because of axioms outside
+    # the module are declared relevant in the module, if their signature is in the signature of the module (other
+    # concepts cannot be subsumers of the concepts over Σ).
+    def __init__(self, tbox):
+        self.tbox = tbox
+        self.signatures = []  # Signature of every axiom
+        self.relevant_concepts = []  # Relevant concepts of every axiom, with their signatures
+        self.side_axioms = []  # Axiom (index) of every side
+        self.side_sizes = []  # Size of the signature of every side
+        self.sides_by_symbol = {}  # Maps a symbol to the sides in whose signature it occurs
+        for i, axiom in enumerate(tbox.axioms):
+            lhs_signature = collect_signature(axiom.lhs, set())
+            rhs_signature = collect_signature(axiom.rhs, set())
+            self.signatures.append(lhs_signature | rhs_signature)
+            relevant_concepts = []
+            collect_relevant_concepts(axiom.lhs, lhs_signature, relevant_concepts)
+            collect_relevant_concepts(axiom.rhs, rhs_signature, relevant_concepts)
+            self.relevant_concepts.append(relevant_concepts)
+            self.add_side(i, lhs_signature)
+            if isinstance(axiom, EquivalenceAxiom):
+                self.add_side(i, rhs_signature)
+
+    def add_side(self, axiom, signature):
+        side = len(self.side_axioms)
+        self.side_axioms.append(axiom)
+        self.side_sizes.append(len(signature))
+        for symbol in signature:
+            self.sides_by_symbol.setdefault(symbol, []).append(side)
+
+    def extract(self, concept_names):
+        # Function to get the indices of the axioms in the module of the signature of the given concept names, and
+        # the concepts that have to be declared relevant in the module
+        missing = list(self.side_sizes)
+        in_module = set()
+        signature = set()
+        pending = []
+
+        def add_axiom(axiom):
+            if axiom not in in_module:
+                in_module.add(axiom)
+                pending.extend(self.signatures[axiom])
+
+        for side, size in enumerate(missing):
+            if size == 0:  # E.g. ⊤ ⊑ C, which is never local
+                add_axiom(self.side_axioms[side])
+        pending.extend(("concept", name) for name in concept_names)
+        while pending:
+            symbol = pending.pop()
+            if symbol in signature:
+                continue
+            signature.add(symbol)
+            for side in self.sides_by_symbol.get(symbol, ()):
+                missing[side] -= 1
+                if missing[side] == 0:
+                    add_axiom(self.side_axioms[side])
+
+        declared_concepts = set()
+        for axiom, relevant_concepts in enumerate(self.relevant_concepts):
+            if axiom not in in_module:
+                for concept, concept_signature in relevant_concepts:
+                    if concept_signature <= signature:
+                        declared_concepts.add(concept)
+        return sorted(in_module), declared_concepts
+
+    def compile_module(self, concept_names):
+        # Function to get the compiled module of the signature of the given concept names. The concept names
+        # themselves are declared in it, even if they do not occur in any axiom of the module.
+        axioms, declared_concepts = self.extract(concept_names)
+        module = TBox([self.tbox.axioms[i] for i in axioms], concept_names)
+        return CompiledOntology(module, declared_concepts)
+
+
+def collect_relevant_concepts(concept, signature, relevant_concepts):
+    # Function to collect a side of an axiom (with the given signature) and its nested conjuncts (see
+    # extract_relevant_concepts), together with their signatures
+    relevant_concepts.append((concept, signature))
+    if isinstance(concept, ConceptConjunction):
+        for conjunct in concept.conjuncts:
+            collect_relevant_concepts(conjunct, collect_signature(conjunct, set()), relevant_concepts)
+
+
+def extract_module(tbox, concept_names, debug=False):
+    # Function to extract and compile the ⊥-locality module of the signature of the given concept names of a TBox
+    start = time.perf_counter()
+    module = ModuleExtractor(tbox).compile_module(concept_names)
+    print("Extracted module of", len(module.tbox.axioms), "of", len(tbox.axioms), "axioms for", len(concept_names),
+          "classes in", "%.1f ms" % ((time.perf_counter() - start) * 1000)) if debug else None
+    return module
@@ -0,0 +1,79 @@
+from concept_factory import CONCEPT_NAME, CONJUNCTION, EXISTENTIAL
+
+# EL normal form: the completion rules only work on axioms of four forms, over concept IDs (see concept_factory.py)
+#   NF1  A ⊑ B           (NF1, A, B)
+#   NF2  A1 ⊓ A2 ⊑ B     (NF2, A1, A2, B)
+#   NF3  A ⊑ ∃r.B        (NF3, A, r, B)
+#   NF4  ∃r.A ⊑ B        (NF4, r, A, B)
+# where A, A1, A2 and B are concept names, ⊤, or fresh names. The ID of every conjunction and existential
+# restriction serves as its fresh name N: the factory gives every distinct subconcept exactly one ID, so N stands for
+# the same concept in all axioms. Every subconcept D = C1 ⊓ C2 or D = ∃r.C of the ontology is defined by the normal
+# form axioms for N ≡ D:
+#   N ⊑ C1, N ⊑ C2, C1 ⊓ C2 ⊑ N              for D = C1 ⊓ C2
+#   N ⊑ ∃r.C, ∃r.C ⊑ N                       for D = ∃r.C
+# (over the fresh names of C1, C2 and C), and an axiom C ⊑ D (or C ≡ D) becomes N_C ⊑ N_D (and N_D ⊑ N_C).
+# Since N ≡ D, an individual gets N iff it is an instance of D, which is how existentials are reported as
+# subsumers. Both directions are defined for every subconcept, whether it occurs on the left or on the right, so
+# existentials with conjunctions in their filler (and nested existentials) are handled like any other concept.
+
+
+NF1 = 1
+NF2 = 2
+NF3 = 3
+NF4 = 4
+
+
+def normalize_axiom(lhs, rhs, is_equivalence):
+    # Function to get the normal form axioms of an axiom given as a triple (lhs, rhs, is_equivalence), without the
+    # definitions of its subconcepts
+    if is_equivalence:
+        return [(NF1, lhs, rhs), (NF1, rhs, lhs)]
+    return [(NF1, lhs, rhs)]
+
+
+def define_concept(factory, concept):
+    # Function to get the normal form axioms that define the fresh name of a conjunction or existential
+    kind = factory.kinds[concept]
+    if kind == CONJUNCTION:
+        left, right = factory.conjuncts[concept]
+        return [(NF1, concept, left), (NF1, concept, right), (NF2, left, right, concept)]
+    if kind == EXISTENTIAL:
+        role, filler = factory.roles[concept], factory.fillers[concept]
+        return [(NF3, concept, role, filler), (NF4, role, filler, concept)]
+    raise ValueError("Concept names and ⊤ have no fresh name")
+
+
+def collect_subconcepts(factory, concepts):
+    # Function to get the conjunctions and existentials (the concepts with a fresh name) among the given concepts
+    # and all their subconcepts (conjuncts and fillers, recursively), as often as they occur
+    kinds = factory.kinds
+    subconcepts = []
+    pending = [concept for concept in concepts if kinds[concept] == CONJUNCTION or kinds[concept] == EXISTENTIAL]
+    while pending:
+        concept = pending.pop()
+        subconcepts.append(concept)
+        if kinds[concept] == CONJUNCTION:
+            parts = factory.conjuncts[concept]
+        else:
+            parts = (factory.fillers[concept],)
+        for part in parts:
+            if kinds[part] == CONJUNCTION or kinds[part] == EXISTENTIAL:
+                pending.append(part)
+    return subconcepts
+
+
+def get_premises(axiom):
+    # Function to get the concepts that can trigger a normal form axiom: an individual that gets one of them may
+    # have to get the conclusion of the axiom (for NF4, an individual that gets A may make its predecessors get B)
+    form = axiom[0]
+    if form == NF1 or form == NF3:
+        return (axiom[1],)
+    if form == NF2:
+        return axiom[1], axiom[2]
+    return (axiom[2],)
+
+
+def is_told_edge(factory, axiom):
+    # Whether a normal form axiom is an edge of the told hierarchy, i.e. A ⊑ B between two concept names
+    kinds = factory.kinds
+    return axiom[0] == NF1 and kinds[axiom[1]] == CONCEPT_NAME and kinds[axiom[2]] == CONCEPT_NAME
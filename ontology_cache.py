@@ -0,0 +1,127 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+
+from compiled_ontology import compile_ontology
+from module_extraction import extract_module
+from owl_loader import load_tbox
+
+# Bump this whenever the layout of CompiledOntology (or of anything it contains) changes, so that stale cache
+# files are ignored instead of being loaded
+CACHE_VERSION = 7
+
+
+def get_cache_dir():
+    # The cache lives in $EL_REASONER_CACHE_DIR if set, and otherwise in ~/.cache/el-reasoner
+    cache_dir = os.environ.get("EL_REASONER_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "el-reasoner")
+
+
+def hash_file(ontology_file):
+    digest = hashlib.sha256()
+    with open(ontology_file, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_cache_path(ontology_hash, backend, cache_dir=None):
+    return os.path.join(cache_dir or get_cache_dir(), ontology_hash + "." + backend + ".bin")
+
+
+def get_module_cache_path(ontology_hash, concept_names, backend, cache_dir=None):
+    # Modules are cached per ontology and signature, so the signature is hashed into the file name as well
+    signature_hash = hashlib.sha256("\n".join(sorted(set(concept_names))).encode("utf-8")).hexdigest()
+    return get_cache_path(ontology_hash + "." + signature_hash, backend + ".module", cache_dir)
+
+
+def read_cache(cache_path):
+    # Function to read a compiled ontology from the cache. Returns None if there is no usable cache file.
+    try:
+        with open(cache_path, "rb") as file:
+            version, compiled = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+        return None
+    if version != CACHE_VERSION:
+        return None
+    return compiled
+
+
+def write_cache(cache_path, compiled):
+    # The cache file is written to a temporary file first and then renamed, so that concurrent runs never see a
+    # partially written file
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            pickle.dump((CACHE_VERSION, compiled), file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def load_compiled_ontology(ontology_file, backend="native", use_cache=True, cache_dir=None, debug=False,
+                           ontology_hash=None, instrumentation=None, gateway=None):
+    # Function to load the compiled ontology for an ontology file. The compiled ontology is cached on disk, keyed by
+    # the SHA-256 of the file content, so it is only parsed and compiled again when the file changes. The gateway
+    # and the instrumentation are passed to load_tbox.
+    if not use_cache:
+        return compile_ontology(load_tbox(ontology_file, backend=backend, instrumentation=instrumentation,
+                                          gateway=gateway))
+
+    start = time.perf_counter()
+    ontology_hash = ontology_hash or hash_file(ontology_file)
+    cache_path = get_cache_path(ontology_hash, backend, cache_dir)
+    compiled = read_cache(cache_path)
+    if compiled is not None:
+        print("Cache hit for", ontology_file, "(" + cache_path + "): loaded in",
+              "%.1f ms" % ((time.perf_counter() - start) * 1000)) if debug else None
+        return compiled
+
+    compiled = compile_ontology(load_tbox(ontology_file, backend=backend, instrumentation=instrumentation,
+                                          gateway=gateway))
+    compiled_time = time.perf_counter()
+    try:
+        write_cache(cache_path, compiled)
+    except OSError as e:
+        print("Could not write cache file", cache_path, ":", e) if debug else None
+    print("Cache miss for", ontology_file + ": parsed and compiled in",
+          "%.1f ms," % ((compiled_time - start) * 1000), "written to", cache_path, "in",
+          "%.1f ms" % ((time.perf_counter() - compiled_time) * 1000)) if debug else None
+    return compiled
+
+
+def load_module(ontology_file, concept_names, backend="native", use_cache=True, cache_dir=None, debug=False,
+                instrumentation=None):
+    # Function to load the compiled ⊥-locality module of the given concept names of an ontology file (see
+    # module_extraction.py). Modules are cached on disk like compiled ontologies, keyed by the SHA-256 of the file
+    # content and of the signature, so queries for the same classes only load their (small) module.
+    if not use_cache:
+        tbox = load_tbox(ontology_file, backend=backend, instrumentation=instrumentation)
+        return extract_module(tbox, concept_names, debug=debug)
+
+    start = time.perf_counter()
+    ontology_hash = hash_file(ontology_file)
+    cache_path = get_module_cache_path(ontology_hash, concept_names, backend, cache_dir)
+    module = read_cache(cache_path)
+    if module is not None:
+        print("Cache hit for the module of", len(concept_names), "classes (" + cache_path + "):",
+              len(module.tbox.axioms), "axioms, loaded in",
+              "%.1f ms" % ((time.perf_counter() - start) * 1000)) if debug else None
+        return module
+
+    compiled = load_compiled_ontology(ontology_file, backend=backend, cache_dir=cache_dir, debug=debug,
+                                      ontology_hash=ontology_hash, instrumentation=instrumentation)
+    module = extract_module(compiled.tbox, concept_names, debug=debug)
+    try:
+        write_cache(cache_path, module)
+    except OSError as e:
+        print("Could not write cache file", cache_path, ":", e) if debug else None
+    return module
@@ -0,0 +1,214 @@
+import xml.etree.ElementTree as ElementTree
+
+from axioms import TBox, TOP, ConceptName, ExistentialRoleRestriction, make_conjunction, make_inclusion_axioms, \
+    make_equivalence_axioms, convert_to_binary_conjunctions, load_tbox_from_gateway
+
+OWL = "{http://www.w3.org/2002/07/owl#}"
+RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+RDFS = "{http://www.w3.org/2000/01/rdf-schema#}"
+
+OWL_THING = "http://www.w3.org/2002/07/owl#Thing"
+OWL_NOTHING = "http://www.w3.org/2002/07/owl#Nothing"
+
+# Class expressions are converted into a pair (concept, complete). The concept is None if the expression cannot be
+# represented in EL at all, and complete is False if parts of it had to be left out. See make_inclusion_axioms.
+UNSUPPORTED = (None, False)
+
+
+def short_name(iri):
+    # Function to turn an IRI into the name used for a concept or role, in the same way as the dl4python formatter:
+    # the fragment after '#', or otherwise the last path segment (or the part after the prefix of an abbreviated IRI)
+    if '#' in iri:
+        return iri.rsplit('#', 1)[1]
+    if '/' in iri:
+        return iri.rstrip('/').rsplit('/', 1)[1]
+    return iri.rsplit(':', 1)[-1]
+
+
+def named_concept(iri):
+    if iri in (OWL_THING, "owl:Thing"):
+        return TOP, True
+    if iri in (OWL_NOTHING, "owl:Nothing"):
+        return UNSUPPORTED
+    return ConceptName(short_name(iri)), True
+
+
+def conjunction_of(operands):
+    conjuncts = []
+    complete = True
+    for concept, operand_complete in operands:
+        complete = complete and operand_complete
+        conjuncts.append(concept)
+    return make_conjunction(conjuncts), complete
+
+
+def existential_of(role, operand):
+    filler, complete = operand
+    if role is None or filler is None:
+        return UNSUPPORTED
+    return ExistentialRoleRestriction(role, filler), complete
+
+
+class RDFXMLReader(object):
+    # Reader for ontologies in RDF/XML syntax, as written by Protégé (e.g. pizza.owl and smoothie.owl)
+
+    def __init__(self):
+        self.axioms = []
+        self.concept_names = set()
+
+    def read_node(self, node):
+        # Function to read a top-level node of the RDF graph. Only classes (named or anonymous) are of interest, all
+        # other nodes (properties, individuals, annotations) are ignored.
+        if node.tag not in (OWL + "Class", RDF + "Description", OWL + "Restriction"):
+            return
+        about = node.get(RDF + "about")
+        if about is not None:
+            subject = named_concept(about)
+            if node.tag == OWL + "Class" and subject[0] is not None and subject[0] != TOP:
+                self.concept_names.add(subject[0].name)
+        else:
+            subject = self.read_class_expression(node)
+
+        for child in node:
+            if child.tag == RDFS + "subClassOf":
+                lhs, lhs_complete = subject
+                rhs, _ = self.read_property_value(child)
+                self.axioms.extend(make_inclusion_axioms(lhs, rhs, lhs_complete))
+            elif child.tag == OWL + "equivalentClass":
+                lhs, lhs_complete = subject
+                rhs, rhs_complete = self.read_property_value(child)
+                self.axioms.extend(make_equivalence_axioms(lhs, rhs, lhs_complete, rhs_complete))
+
+    def read_property_value(self, element):
+        # The value of a property is either a reference to a named class or a nested class expression
+        resource = element.get(RDF + "resource")
+        if resource is not None:
+            return named_concept(resource)
+        for child in element:
+            return self.read_class_expression(child)
+        return UNSUPPORTED
+
+    def read_class_expression(self, element):
+        about = element.get(RDF + "about")
+        if about is not None:
+            return named_concept(about)
+        if element.tag == OWL + "Restriction":
+            return self.read_restriction(element)
+        if element.tag == OWL + "Class":
+            for child in element:
+                if child.tag == OWL + "intersectionOf":
+                    return conjunction_of([self.read_class_expression(member) for member in child])
+        return UNSUPPORTED
+
+    def read_restriction(self, element):
+        role = None
+        operand = UNSUPPORTED
+        for child in element:
+            if child.tag == OWL + "onProperty":
+                resource = child.get(RDF + "resource")
+                role = short_name(resource) if resource is not None else None
+            elif child.tag == OWL + "someValuesFrom":
+                operand = self.read_property_value(child)
+            elif child.tag not in (RDFS + "subClassOf", OWL + "equivalentClass"):
+                # Universal, value and cardinality restrictions are not part of EL
+                return UNSUPPORTED
+        return existential_of(role, operand)
+
+
+class OWLXMLReader(object):
+    # Reader for ontologies in OWL/XML syntax, as used by the ontologies in ontologies/
+
+    def __init__(self):
+        self.axioms = []
+        self.concept_names = set()
+
+    def read_node(self, node):
+        # Function to read a top-level element of the ontology. Only declarations of classes, SubClassOf and
+        # EquivalentClasses axioms are of interest.
+        if node.tag == OWL + "Declaration":
+            for child in node:
+                if child.tag == OWL + "Class":
+                    concept, _ = self.read_class_expression(child)
+                    if concept is not None and concept != TOP:
+                        self.concept_names.add(concept.name)
+        elif node.tag == OWL + "SubClassOf":
+            operands = self.read_operands(node)
+            if len(operands) == 2:
+                (lhs, lhs_complete), (rhs, _) = operands
+                self.axioms.extend(make_inclusion_axioms(lhs, rhs, lhs_complete))
+        elif node.tag == OWL + "EquivalentClasses":
+            operands = self.read_operands(node)
+            if operands:
+                first, first_complete = operands[0]
+                for other, other_complete in operands[1:]:
+                    self.axioms.extend(make_equivalence_axioms(first, other, first_complete, other_complete))
+
+    def read_operands(self, element):
+        return [self.read_class_expression(child) for child in element if child.tag != OWL + "Annotation"]
+
+    def read_iri(self, element):
+        iri = element.get("IRI")
+        if iri is None:
+            iri = element.get("abbreviatedIRI")
+        return iri
+
+    def read_class_expression(self, element):
+        if element.tag == OWL + "Class":
+            return named_concept(self.read_iri(element))
+        if element.tag == OWL + "ObjectIntersectionOf":
+            return conjunction_of(self.read_operands(element))
+        if element.tag == OWL + "ObjectSomeValuesFrom":
+            children = list(element)
+            if len(children) != 2 or children[0].tag != OWL + "ObjectProperty":
+                return UNSUPPORTED
+            return existential_of(short_name(self.read_iri(children[0])), self.read_class_expression(children[1]))
+        return UNSUPPORTED
+
+
+def parse_owl_file(ontology_file):
+    # Function to parse an ontology in RDF/XML or OWL/XML syntax into a native TBox, without starting a JVM.
+    # The file is read incrementally: every top-level element is converted as soon as it has been parsed, and
+    # discarded afterwards, so memory use does not grow with the size of the XML tree.
+    reader = None
+    depth = 0
+    root = None
+    for event, element in ElementTree.iterparse(ontology_file, events=("start", "end")):
+        if event == "start":
+            if depth == 0:
+                root = element
+                reader = OWLXMLReader() if element.tag == OWL + "Ontology" else RDFXMLReader()
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            reader.read_node(element)
+            root.remove(element)
+
+    if reader is None:
+        raise ValueError("Not an ontology: " + str(ontology_file))
+    tbox = TBox(reader.axioms, reader.concept_names)
+    convert_to_binary_conjunctions(tbox)
+    return tbox
+
+
+def load_tbox(ontology_file, backend="native", instrumentation=None, gateway=None):
+    # Function to load the TBox of an ontology file, either with the native parser or with dl4python. For the
+    # dl4python backend, a connection to the gateway is opened (which starts the JVM if it is not running yet, see
+    # gateway.py), unless an open gateway is given. The managed JVM is kept from being stopped as idle while the TBox
+    # is loaded. If an Instrumentation is given, the calls to a newly opened gateway are recorded in it.
+    if backend == "native":
+        return parse_owl_file(ontology_file)
+    if backend == "py4j":
+        from gateway import connect_gateway, keep_alive
+
+        if gateway is None:
+            gateway = connect_gateway()
+            if instrumentation is not None:
+                instrumentation.instrument_gateway(gateway)
+        with keep_alive():  # Parsing and copying a large ontology can take longer than the idle timeout
+            parser = gateway.getOWLParser()
+            ontology = parser.parseFile(ontology_file)
+            gateway.convertToBinaryConjunctions(ontology)
+            formatter = gateway.getSimpleDLFormatter()
+            return load_tbox_from_gateway(ontology, formatter)
+    raise ValueError("Unknown backend: " + str(backend))
@@ -0,0 +1,63 @@
+import multiprocessing
+
+from el_reasoner import ELReasoner
+
+# The compiled ontology used by the worker processes. It is set before the pool is created, so that with the fork
+# start method every worker shares the parent's copy (copy-on-write) instead of receiving its own copy.
+shared_ontology = None
+shared_options = {}  # Keyword arguments of the reasoners of the workers
+worker_reasoner = None  # The reasoner of a worker process, which saturates all partitions given to the worker
+
+
+def init_worker(ontology, options):
+    # Only used when processes cannot be forked: the ontology is then pickled once per worker
+    global shared_ontology, shared_options
+    shared_ontology = ontology
+    shared_options = options
+
+
+def classify_partition(concept_names):
+    # A worker keeps its reasoner between partitions, so that the successors that its partitions share are derived
+    # only once per worker
+    global worker_reasoner
+    if worker_reasoner is None or worker_reasoner.ontology is not shared_ontology:
+        worker_reasoner = ELReasoner(shared_ontology, **shared_options)
+    return worker_reasoner.classify(concept_names)
+
+
+def partition(concept_names, partitions):
+    # Function to split the concept names into contiguous partitions of (nearly) equal size. Contiguous partitions
+    # keep names that are close in the ontology (e.g. OBO IDs of sibling classes) together, so that they can share
+    # successors within a worker.
+    size, remainder = divmod(len(concept_names), partitions)
+    parts = []
+    start = 0
+    for i in range(partitions):
+        end = start + size + (1 if i < remainder else 0)
+        if end > start:
+            parts.append(concept_names[start:end])
+        start = end
+    return parts
+
+
+def classify_parallel(ontology, jobs, partitions_per_job=4, **options):
+    # Function to classify an ontology with a pool of jobs worker processes. The concept names are partitioned,
+    # every worker saturates its partitions, one after the other, in a reasoner of its own over the shared compiled
+    # ontology, and the subsumer maps of all partitions are merged at the end. The options (e.g. engine) are passed to the reasoners.
+    global shared_ontology, shared_options
+    concept_names = sorted(ontology.tbox.concept_names)
+    parts = partition(concept_names, jobs * partitions_per_job)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        shared_ontology = ontology
+        shared_options = options
+        pool = multiprocessing.get_context("fork").Pool(jobs)
+    else:
+        pool = multiprocessing.Pool(jobs, initializer=init_worker, initargs=(ontology, options))
+
+    subsumers = {}
+    with pool:
+        for partial_subsumers in pool.imap_unordered(classify_partition, parts):
+            subsumers.update(partial_subsumers)
+    shared_ontology = None
+    return {concept_name: subsumers[concept_name] for concept_name in concept_names}
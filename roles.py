@@ -1,7 +1,6 @@
-from individual import Individual
-
-
 class Role(object):
-    def __init__(self, relation, successor: Individual):
+    __slots__ = ("relation", "successor")
+
+    def __init__(self, relation, successor: "Individual"):
         self.relation = relation
         self.successor = successor
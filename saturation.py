@@ -0,0 +1,276 @@
+import time
+from collections import deque
+
+from concept_factory import TOP_ID
+from individual import add_adjacent, remove_adjacent, get_adjacent
+from normal_form import NF1, NF2, NF3, get_premises
+
+
+class WorklistEngine(object):
+    # Saturation engine in the style of ELK and CEL. Instead of applying every rule to every individual until nothing
+    # changes, every newly derived fact is put on a queue: either a concept assigned to an individual, or a role
+    # between two individuals. Processing a fact only applies the rule instances that the fact can enable, and
+    # saturation is done when the queue is empty.
+    # The engine works on the individuals of the reasoner, so it derives exactly the same facts as the naive rules
+    # in ELReasoner, and individuals added to the reasoner directly (e.g. by initialize_individual) are picked up
+    # at the start of the next saturation.
+    def __init__(self, reasoner):
+        self.reasoner = reasoner
+        self.factory = reasoner.factory
+        self.index = reasoner.index
+        self.queue = deque()
+        self.known_individuals = set()  # Individuals whose initial facts have been queued
+        self.predecessors = {}  # Maps an individual to the adjacency of its predecessors (see individual.py)
+        self.instrumentation = reasoner.instrumentation
+
+    def saturate(self):
+        # Function to process facts until the queue is empty
+        if self.instrumentation is not None:
+            self.saturate_instrumented()
+            return
+        self.register_new_individuals()
+        while self.queue:
+            fact = self.queue.popleft()
+            if len(fact) == 2:
+                self.process_concept(*fact)
+            else:
+                self.process_role(*fact)
+
+    def saturate_instrumented(self):
+        for _ in self.instrumented_steps():
+            pass
+
+    def steps(self):
+        # Generator that processes facts until the queue is empty, and yields after every fact
+        if self.instrumentation is not None:
+            yield from self.instrumented_steps()
+            return
+        self.register_new_individuals()
+        while self.queue:
+            fact = self.queue.popleft()
+            if len(fact) == 2:
+                self.process_concept(*fact)
+            else:
+                self.process_role(*fact)
+            yield
+
+    def instrumented_steps(self, growth_interval=4096):
+        # Like steps, but records every processed fact (as an iteration), the time spent processing concepts and
+        # roles, and the growth of the completion graph (every growth_interval facts) in the instrumentation. The
+        # facts derived by every rule are recorded by add_concept and add_successor. The totals are recorded as well
+        # when the caller stops early (e.g. is_subsumed_by and iter_subsumers).
+        instrumentation = self.instrumentation
+        start = time.perf_counter()
+        concept_time = role_time = 0.0
+        concept_facts = role_facts = 0
+        self.register_new_individuals()
+        try:
+            while self.queue:
+                fact = self.queue.popleft()
+                fact_start = time.perf_counter()
+                if len(fact) == 2:
+                    self.process_concept(*fact)
+                    concept_time += time.perf_counter() - fact_start
+                    concept_facts += 1
+                else:
+                    self.process_role(*fact)
+                    role_time += time.perf_counter() - fact_start
+                    role_facts += 1
+                instrumentation.iterations += 1
+                if instrumentation.iterations % growth_interval == 0:
+                    instrumentation.sample_growth(self.reasoner.individuals)
+                yield
+        finally:
+            end = time.perf_counter()
+            instrumentation.processed("process_concept", concept_facts, concept_time)
+            instrumentation.processed("process_role", role_facts, role_time)
+            instrumentation.sample_growth(self.reasoner.individuals)
+            instrumentation.span("saturate", start, end)
+
+    def register_new_individuals(self):
+        for ind in list(self.reasoner.individuals.values()):
+            if ind not in self.known_individuals:
+                self.register_individual(ind)
+
+    def register_individual(self, ind):
+        # Queue everything that is already known about a new individual, and assign ⊤ to it (top rule)
+        self.known_individuals.add(ind)
+        self.reasoner.individuals_by_initial_concept.setdefault(ind.initial_concept, ind)
+        self.predecessors.setdefault(ind, {})
+        for concept in ind.concepts:
+            self.queue.append((ind, concept))
+        for relation, successor in ind.iter_roles():
+            self.queue.append((ind, relation, successor))
+        self.add_concept(ind, TOP_ID, "top_rule")
+
+    def add_concept(self, ind, concept, rule):
+        # The rule that derived the concept is only used for the instrumentation
+        if concept not in ind.concepts:
+            ind.concepts.add(concept)
+            self.queue.append((ind, concept))
+            if self.instrumentation is not None:
+                self.instrumentation.derived(rule)
+
+    def process_concept(self, ind, concept, expand_told=True):
+        # Applies the normal form axioms (see normal_form.py) that the concept can trigger, looking them up in the
+        # rule tables of the index
+        index = self.index
+
+        # If d has A assigned and A ⊑ B, then also assign B to d. For a concept name A, all concept names B that
+        # follow from the told hierarchy are assigned at once, and processed right away without expanding their own
+        # told subsumers, which are among those of A (A itself is among them as well, but already assigned).
+        if expand_told:
+            for superclass in index.get_told_closure().get(concept, ()):
+                if superclass not in ind.concepts:
+                    ind.concepts.add(superclass)
+                    if self.instrumentation is not None:
+                        self.instrumentation.derived("told_closure_rule")
+                    self.process_concept(ind, superclass, False)
+        superclasses = index.told_superclasses[concept]
+        if superclasses is not None:
+            for superclass in superclasses:
+                self.add_concept(ind, superclass, "concept_inclusion_rule")
+
+        # If d has A1 and A2 assigned and A1 ⊓ A2 ⊑ B, then also assign B to d
+        conjunctions = index.conjunctions_by_conjunct[concept]
+        if conjunctions is not None:
+            for other, conclusion in conjunctions:
+                if other in ind.concepts:
+                    self.add_concept(ind, conclusion, "conjunction_rule")
+
+        # If d has A assigned and A ⊑ ∃r.B, make the individual with initial concept B (a new one if necessary) an
+        # r-successor of d
+        existentials = index.existentials_by_concept[concept]
+        if existentials is not None:
+            for relation, filler in existentials:
+                self.add_successor(ind, relation, filler)
+
+        # If d has an r-successor with A assigned and ∃r.A ⊑ B, then also assign B to d
+        existentials = index.existentials_by_filler[concept]
+        if existentials is not None:
+            predecessors = self.predecessors[ind]
+            for relation, conclusion in existentials:
+                for predecessor in get_adjacent(predecessors, relation):
+                    self.add_concept(predecessor, conclusion, "existential_rule_2")
+
+    def add_successor(self, ind, relation, target_concept):
+        successor = self.reasoner.individuals_by_initial_concept.get(target_concept)
+        if successor is None:
+            successor = self.reasoner.new_individual(target_concept)
+            self.register_individual(successor)
+        if ind.add_role(relation, successor):
+            self.queue.append((ind, relation, successor))
+            if self.instrumentation is not None:
+                self.instrumentation.derived("existential_rule_1")
+
+    def process_role(self, ind, relation, successor):
+        # If d has an r-successor with A assigned and ∃r.A ⊑ B, then also assign B to d
+        add_adjacent(self.predecessors[successor], relation, ind)
+        existentials_by_filler = self.index.existentials_by_filler
+        for concept in list(successor.concepts):
+            existentials = existentials_by_filler[concept]
+            if existentials is not None:
+                for existential_relation, conclusion in existentials:
+                    if existential_relation == relation:
+                        self.add_concept(ind, conclusion, "existential_rule_2")
+
+    def reseed(self, added_axioms):
+        # Function to queue the facts that can trigger rule applications that were not possible before some normal
+        # form axioms were added. Everything derived so far stays valid, because the rules are monotonic, so only
+        # the premises of the new axioms have to be processed again.
+        triggers = set()
+        for axiom in added_axioms:
+            triggers.update(get_premises(axiom))
+
+        self.register_new_individuals()
+        for ind in self.reasoner.individuals.values():
+            for concept in triggers.intersection(ind.concepts):
+                self.queue.append((ind, concept))
+
+    def overdelete(self, removed_axioms):
+        # First phase of retracting normal form axioms in the style of DRed: delete every fact that was derived with
+        # one of the removed axioms, and then everything that was derived from a deleted fact. This deletes too much
+        # (facts may have other derivations), which is repaired by rederive. It has to run before the axioms are
+        # removed from the index, because it follows the rule applications of the old ontology. Returns the
+        # individuals that lost facts.
+        self.register_new_individuals()
+        index = self.index
+        told_closure = index.get_told_closure()
+        deleted = {}  # Maps an individual to the set of concepts deleted from it
+        deleted_roles = {}  # Maps an individual to the set of (relation, successor) pairs deleted from it
+        pending = deque()
+
+        def delete(ind, concept):
+            if concept not in ind.concepts:
+                return
+            if concept == TOP_ID or concept == ind.initial_concept:
+                return
+            concepts = deleted.setdefault(ind, set())
+            if concept not in concepts:
+                concepts.add(concept)
+                pending.append((ind, concept))
+
+        def delete_role(ind, relation, filler):
+            # Deletes the role to the successor with the filler as initial concept, and what ∃r.A ⊑ B derived over it
+            successor = self.reasoner.individuals_by_initial_concept.get(filler)
+            if successor is not None and ind.has_role(relation, successor):
+                deleted_roles.setdefault(ind, set()).add((relation, successor))
+                for successor_concept in list(successor.concepts):
+                    for existential_relation, conclusion in index.existentials_by_filler[successor_concept] or ():
+                        if existential_relation == relation:
+                            delete(ind, conclusion)
+
+        for ind in self.reasoner.individuals.values():
+            concepts = ind.concepts
+            for axiom in removed_axioms:
+                form = axiom[0]
+                if form == NF1:
+                    if axiom[1] in concepts:
+                        delete(ind, axiom[2])
+                elif form == NF2:
+                    if axiom[1] in concepts and axiom[2] in concepts:
+                        delete(ind, axiom[3])
+                elif form == NF3:
+                    if axiom[1] in concepts:
+                        delete_role(ind, axiom[2], axiom[3])
+                else:
+                    _, relation, filler, conclusion = axiom
+                    for successor in get_adjacent(ind.successors, relation):
+                        if filler in successor.concepts:
+                            delete(ind, conclusion)
+
+        while pending:
+            ind, concept = pending.popleft()
+            for superclass in told_closure.get(concept, ()):
+                delete(ind, superclass)
+            for superclass in index.told_superclasses[concept] or ():
+                delete(ind, superclass)
+            for other, conclusion in index.conjunctions_by_conjunct[concept] or ():
+                if other in ind.concepts:
+                    delete(ind, conclusion)
+            for relation, filler in index.existentials_by_concept[concept] or ():
+                delete_role(ind, relation, filler)
+            for relation, conclusion in index.existentials_by_filler[concept] or ():
+                for predecessor in get_adjacent(self.predecessors[ind], relation):
+                    delete(predecessor, conclusion)
+
+        for ind, concepts in deleted.items():
+            ind.concepts.difference_update(concepts)
+            if self.instrumentation is not None:
+                self.instrumentation.derived("overdelete", len(concepts))
+        for ind, roles in deleted_roles.items():
+            for relation, successor in roles:
+                ind.remove_role(relation, successor)
+                remove_adjacent(self.predecessors[successor], relation, ind)
+        return set(deleted) | set(deleted_roles)
+
+    def rederive(self, affected_individuals):
+        # Second phase of retracting axioms: facts deleted by overdelete that still have a derivation must be derived
+        # again. Every rule application that derives a fact for an individual has its premises in that individual
+        # or in its successors, so all remaining facts of the affected individuals and their roles are queued again.
+        for ind in affected_individuals:
+            for concept in ind.concepts:
+                self.queue.append((ind, concept))
+            for relation, successor in ind.iter_roles():
+                self.queue.append((ind, relation, successor))
+
@@ -0,0 +1,222 @@
+import errno
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+from el_reasoner import ELReasoner
+from ontology_cache import load_compiled_ontology
+
+# Reasoning daemon: keeps ontologies loaded, compiled and saturated in memory, and answers queries over a unix
+# socket. The protocol is JSON lines: every request is one JSON object on a line, and is answered by one JSON object
+# on a line. Requests:
+#   {"op": "load", "ontology": PATH}                               -> {"ok": true, "classes": N}
+#   {"op": "subsumers", "ontology": PATH, "class": A}              -> {"ok": true, "subsumers": [...]}
+#   {"op": "check", "ontology": PATH, "sub": A, "sup": B}          -> {"ok": true, "subsumed": true/false}
+#   {"op": "stats"}                                                -> {"ok": true, "cache": {...}, "latency": {...}}
+# Errors, including queries for classes that are not in the ontology, are answered with {"ok": false, "error":
+# MESSAGE}. Ontologies are loaded on their first query, and loaded again when their file changes.
+
+
+class LRUCache(object):
+    # Least recently used cache with a bound on the number of entries, counting its hits and misses
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def remove_if(self, predicate):
+        for key in [key for key in self.entries if predicate(key)]:
+            del self.entries[key]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self.entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class ReasoningService(object):
+    # The state of the daemon: the saturated reasoner of every loaded ontology, the cache of the subsumers of the
+    # classes queried so far, and the latencies of the last requests. Reasoners are not thread-safe, so requests
+    # are handled one at a time.
+    def __init__(self, cache_size=10000, backend="native", engine="worklist", labels="set", use_cache=True,
+                 latency_window=1000):
+        self.backend = backend
+        self.engine = engine
+        self.labels = labels
+        self.use_cache = use_cache
+        self.reasoners = {}  # Maps the absolute path of an ontology file to (modification time, reasoner)
+        self.cache = LRUCache(cache_size)  # Maps (path, class) to the set of subsumers of the class
+        self.latencies = {}  # Maps an operation to the latencies (in seconds) of its last requests
+        self.requests = {}  # Maps an operation to the number of requests
+        self.latency_window = latency_window
+        self.lock = threading.Lock()
+
+    def get_reasoner(self, ontology_file):
+        # Function to get the saturated reasoner of an ontology file, loading it if it is not loaded yet or if the
+        # file changed since it was loaded
+        path = os.path.abspath(ontology_file)
+        modification_time = os.stat(path).st_mtime_ns
+        loaded = self.reasoners.get(path)
+        if loaded is not None and loaded[0] == modification_time:
+            return path, loaded[1]
+        ontology = load_compiled_ontology(path, backend=self.backend, use_cache=self.use_cache)
+        reasoner = ELReasoner(ontology, engine=self.engine, labels=self.labels)
+        reasoner.classify()
+        self.reasoners[path] = (modification_time, reasoner)
+        self.cache.remove_if(lambda key: key[0] == path)
+        return path, reasoner
+
+    def get_subsumers(self, ontology_file, class_name):
+        # Unknown class names are rejected: querying them would add an individual to the shared reasoner (and an
+        # entry to the cache) for every name a client makes up
+        path, reasoner = self.get_reasoner(ontology_file)
+        if class_name not in reasoner.tbox.concept_names:
+            raise ValueError("Unknown class: " + class_name)
+        subsumers = self.cache.get((path, class_name))
+        if subsumers is None:
+            subsumers = reasoner.get_all_subsumers(class_name)
+            self.cache.put((path, class_name), subsumers)
+        return subsumers
+
+    def handle(self, request):
+        # Function to answer a request (a dict), returning the response (a dict)
+        start = time.perf_counter()
+        op = request.get("op") if isinstance(request, dict) else None
+        with self.lock:
+            try:
+                response = self.answer(op, request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            if op in ("load", "subsumers", "check", "stats"):
+                self.record_latency(op, time.perf_counter() - start)
+        return response
+
+    def answer(self, op, request):
+        if op == "load":
+            _, reasoner = self.get_reasoner(get_field(request, "ontology"))
+            return {"ok": True, "classes": len(reasoner.tbox.concept_names)}
+        if op == "subsumers":
+            subsumers = self.get_subsumers(get_field(request, "ontology"), get_field(request, "class"))
+            return {"ok": True, "subsumers": sorted(subsumers)}
+        if op == "check":
+            # The subsumers of the subclass are cached, so that later queries for it are answered from the cache
+            subsumers = self.get_subsumers(get_field(request, "ontology"), get_field(request, "sub"))
+            return {"ok": True, "subsumed": get_field(request, "sup") in subsumers}
+        if op == "stats":
+            return {"ok": True, "ontologies": sorted(self.reasoners), "cache": self.cache.stats(),
+                    "latency": self.latency_stats()}
+        raise ValueError("Unknown op: " + str(op))
+
+    def record_latency(self, op, latency):
+        latencies = self.latencies.get(op)
+        if latencies is None:
+            latencies = self.latencies[op] = deque(maxlen=self.latency_window)
+        latencies.append(latency)
+        self.requests[op] = self.requests.get(op, 0) + 1
+
+    def latency_stats(self):
+        # Latencies in milliseconds over the last requests of every operation
+        stats = {}
+        for op, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            stats[op] = {"requests": self.requests[op], "mean_ms": 1000 * sum(ordered) / len(ordered),
+                         "p50_ms": 1000 * ordered[len(ordered) // 2],
+                         "p99_ms": 1000 * ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)],
+                         "max_ms": 1000 * ordered[-1]}
+        return stats
+
+
+def get_field(request, name):
+    value = request.get(name)
+    if not isinstance(value, str):
+        raise ValueError("Missing field: " + name)
+    return value
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"ok": False, "error": "Invalid JSON: " + str(e)}
+            else:
+                response = self.server.service.handle(request)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ReasoningServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        self.service = service
+        if os.path.exists(socket_path):
+            if is_listening(socket_path):
+                raise OSError(errno.EADDRINUSE, "Another daemon is listening on " + socket_path)
+            os.unlink(socket_path)  # Left over by a daemon that did not shut down cleanly
+        super().__init__(socket_path, RequestHandler)
+
+
+def is_listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path, ontology_files=(), **options):
+    # Function to run the daemon on a unix socket until it is interrupted. The given ontology files are loaded
+    # before the first request is answered; the options are passed to ReasoningService. Raises an OSError if
+    # another daemon is listening on the socket.
+    service = ReasoningService(**options)
+    server = ReasoningServer(socket_path, service)
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))  # Clean up the socket on kill as well
+    try:
+        for ontology_file in ontology_files:
+            service.get_reasoner(ontology_file)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+
+
+def send_requests(socket_path, requests):
+    # Function to send requests to a daemon over one connection, returning the responses
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            responses = []
+            for request in requests:
+                stream.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+                stream.flush()
+                responses.append(json.loads(stream.readline()))
+            return responses
@@ -0,0 +1,124 @@
+class TaxonomyNode(object):
+    # A node of the taxonomy: a group of equivalent concept names, with the nodes of its direct superclasses and
+    # direct subclasses
+    __slots__ = ("names", "parents", "children")
+
+    def __init__(self, names):
+        self.names = names
+        self.parents = []
+        self.children = []
+
+    def __repr__(self):
+        return "TaxonomyNode(" + ", ".join(sorted(self.names)) + ")"
+
+
+class Taxonomy(object):
+    # The hierarchy of the concept names of a classification: the transitive reduction of the subsumption relation
+    # between the groups of equivalent concept names. The top node (with no names, standing for ⊤) is the parent of
+    # the nodes without superclasses.
+    # Ancestors and descendants are found by traversing the hierarchy, so they take time proportional to the number
+    # of nodes and edges in the answer, not to the size of the taxonomy.
+    def __init__(self):
+        self.top = TaxonomyNode(frozenset())
+        self.nodes = {}  # Maps every concept name to its node
+
+    def __contains__(self, name):
+        return name in self.nodes
+
+    def __iter__(self):
+        # Iterates over the nodes (except the top node) top-down: every node comes after its parents
+        pending = [self.top]
+        remaining = {}  # Maps a node to the number of its parents that were not visited yet
+        while pending:
+            node = pending.pop()
+            if node is not self.top:
+                yield node
+            for child in node.children:
+                count = remaining.get(child, len(child.parents)) - 1
+                remaining[child] = count
+                if count == 0:
+                    pending.append(child)
+
+    def get_node(self, name):
+        node = self.nodes.get(name)
+        if node is None:
+            raise KeyError("Unknown concept name: " + name)
+        return node
+
+    def equivalents(self, name):
+        return set(self.get_node(name).names)
+
+    def direct_superclasses(self, name):
+        return [set(parent.names) for parent in self.get_node(name).parents if parent is not self.top]
+
+    def direct_subclasses(self, name):
+        return [set(child.names) for child in self.get_node(name).children]
+
+    def ancestors(self, name):
+        # Function to get the concept names that strictly subsume a concept name
+        return names_of(reachable(self.get_node(name), "parents"))
+
+    def descendants(self, name):
+        # Function to get the concept names that are strictly subsumed by a concept name
+        return names_of(reachable(self.get_node(name), "children"))
+
+
+def reachable(node, direction):
+    # Function to get the nodes reachable from a node over its parents or over its children, without the node itself
+    visited = set()
+    pending = list(getattr(node, direction))
+    while pending:
+        node = pending.pop()
+        if node not in visited:
+            visited.add(node)
+            pending.extend(getattr(node, direction))
+    return visited
+
+
+def names_of(nodes):
+    names = set()
+    for node in nodes:
+        names.update(node.names)
+    return names
+
+
+def build_taxonomy(classification):
+    # Function to build the taxonomy of a classification (a dict mapping every concept name to the set of its
+    # concept name subsumers, as returned by ELReasoner.classify). Subsumers that are not classified themselves are
+    # ignored.
+    # Concept names are equivalent iff they subsume each other, so the equivalence group of A consists of the
+    # subsumers of A that have A as subsumer. The groups are inserted top-down in the order of the number of their
+    # subsumers, which is a topological order: a strict subsumer has fewer subsumers. When a node is inserted, all
+    # of its ancestors are in the taxonomy already, and none of its descendants, so only its direct parents have
+    # to be found. They are found by a top search as in the enhanced traversal algorithm: starting from the top
+    # node, the search descends into the children that subsume the new node (a set lookup in its subsumers), and
+    # the visited nodes without such a child are its direct parents.
+    taxonomy = Taxonomy()
+    subsumers_by_node = []
+    for name in sorted(classification, key=lambda name: len(classification[name])):
+        if name in taxonomy.nodes:
+            continue
+        subsumers = classification[name]
+        node = TaxonomyNode(frozenset(subsumer for subsumer in subsumers
+                                      if subsumer == name or name in classification.get(subsumer, ())))
+        for equivalent in node.names:
+            taxonomy.nodes[equivalent] = node
+        subsumers_by_node.append((node, subsumers))
+
+    for node, subsumers in subsumers_by_node:
+        visited = {taxonomy.top}
+        pending = [taxonomy.top]
+        while pending:
+            candidate = pending.pop()
+            is_parent = True
+            for child in candidate.children:
+                if next(iter(child.names)) in subsumers:
+                    is_parent = False
+                    if child not in visited:
+                        visited.add(child)
+                        pending.append(child)
+            if is_parent:
+                node.parents.append(candidate)
+        for parent in node.parents:
+            parent.children.append(node)
+    return taxonomy
@@ -1,7 +1,19 @@
 import sys
 import os
-from py4j.java_gateway import JavaGateway
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from axioms import TBox, ConceptName, ConceptConjunction, ExistentialRoleRestriction, GeneralConceptInclusion, \
+    EquivalenceAxiom
+from classification_index import write_classification, ClassificationIndex
 from el_reasoner import ELReasoner
+from module_extraction import extract_module
+from owl_loader import load_tbox
+from parallel import classify_parallel
+
+# Run with "python tests/test.py py4j" to parse the ontologies with dl4python instead of the native parser
+backend = sys.argv[1] if len(sys.argv) > 1 else "native"
 
 test_cases = {
     "1": {
@@ -21,18 +33,15 @@ test_cases = {
     }
 }
 
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
 for number, test in test_cases.items():
     file = test["file"]
-    script_dir = os.path.dirname(os.path.abspath(__file__))
     file_path = os.path.join(script_dir, file)
 
-    gateway = JavaGateway()
-    parser = gateway.getOWLParser()
-    ontology = parser.parseFile(file_path)
-    gateway.convertToBinaryConjunctions(ontology)
-    formatter = gateway.getSimpleDLFormatter()
+    tbox = load_tbox(file_path, backend=backend)
 
-    reasoner = ELReasoner(ontology, formatter, debug=False)
+    reasoner = ELReasoner(tbox, debug=False)
     subsumers = reasoner.get_all_subsumers(test["class"])
 
     for expected_subsumer in test["expected_subsumers"]:
@@ -41,4 +50,129 @@ for number, test in test_cases.items():
             print("Subsumers: " + str(subsumers))
             sys.exit(1)
 
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        sys.exit(1)
+
+
+# Removing an axiom after a completion that stopped early (is_subsumed_by) must not keep what the removed axiom
+# derived
+A, X, Y, Z = (ConceptName(name) for name in "AXYZ")
+removed_axiom = GeneralConceptInclusion(A, ConceptConjunction([X, Y]))
+reasoner = ELReasoner(TBox([removed_axiom, GeneralConceptInclusion(X, Z)]))
+check(reasoner.is_subsumed_by("A", "X"), "Expected A to be subsumed by X")
+reasoner.remove_axioms([removed_axiom])
+subsumers = reasoner.get_all_subsumers("A")
+check(subsumers == {"A"}, "Subsumers of A after removing A ⊑ X ⊓ Y: " + str(subsumers))
+
+
+# Removing and adding axioms again must give the same subsumers as a reasoner built from scratch on the edited TBox
+A, B, C, D, E, F, G = (ConceptName(name) for name in "ABCDEFG")
+incremental_axioms = [
+    EquivalenceAxiom(A, B),  # Equivalence cycle A ≡ B ⊑ C ⊑ A
+    GeneralConceptInclusion(B, C),
+    GeneralConceptInclusion(C, A),
+    GeneralConceptInclusion(A, ExistentialRoleRestriction("r", D)),  # Existential chain A → D → E
+    GeneralConceptInclusion(D, ExistentialRoleRestriction("r", E)),
+    GeneralConceptInclusion(ExistentialRoleRestriction("r", ExistentialRoleRestriction("r", E)), F),
+    GeneralConceptInclusion(ConceptConjunction([F, C]), G),  # Conjunctions, also in a filler
+    GeneralConceptInclusion(E, ConceptConjunction([F, G])),
+    GeneralConceptInclusion(ExistentialRoleRestriction("r", ConceptConjunction([F, G])), E),
+]
+incremental_names = sorted("ABCDEFG")
+for engine in ["worklist", "naive"]:
+    reasoner = ELReasoner(TBox(list(incremental_axioms)), engine=engine)
+    reasoner.get_subsumers_batch(incremental_names)
+    for axiom in incremental_axioms:
+        for edit in ["remove", "add"]:
+            if edit == "remove":
+                reasoner.remove_axioms([axiom])
+                edited_axioms = [other for other in incremental_axioms if other != axiom]
+            else:
+                reasoner.add_axioms([axiom])
+                edited_axioms = incremental_axioms
+            subsumers = reasoner.get_subsumers_batch(incremental_names)
+            expected = ELReasoner(TBox(list(edited_axioms)), engine=engine).get_subsumers_batch(incremental_names)
+            check(subsumers == expected, "Subsumers after " + edit + " " + str(axiom) + " with the " + engine +
+                  " engine: " + str(subsumers) + ", expected " + str(expected))
+
+
+# A classification written with write_classification must be read back unchanged by ClassificationIndex
+with tempfile.TemporaryDirectory() as directory:
+    for file in ["animal.owl", "person.owl", "transport.owl"]:
+        classification = ELReasoner(load_tbox(os.path.join(script_dir, "ontologies", file), backend=backend)).classify()
+        index_path = os.path.join(directory, file + ".elci")
+        write_classification(index_path, classification)
+        with ClassificationIndex(index_path) as index:
+            for class_name, subsumers in classification.items():
+                check(index.subsumers(class_name) == subsumers, "Subsumers of " + class_name + " in the index of " +
+                      file + ": " + str(index.subsumers(class_name)) + ", expected " + str(subsumers))
+                for other in classification:
+                    check(index.is_subsumed(class_name, other) == (other in subsumers),
+                          "is_subsumed(" + class_name + ", " + other + ") in the index of " + file)
+            check(index.subsumers("NotAClass") == set(), "Unknown class with subsumers in the index of " + file)
+            check(not index.is_subsumed("NotAClass", class_name) and not index.is_subsumed(class_name, "NotAClass"),
+                  "Unknown class subsumed in the index of " + file)
+
+
+# The taxonomy must be the transitive reduction of the classification: an equivalence group A ≡ B below a diamond
+# C, D ⊑ E, with a redundant edge F ⊑ E
+taxonomy_axioms = [
+    EquivalenceAxiom(A, B),
+    GeneralConceptInclusion(A, C),
+    GeneralConceptInclusion(A, D),
+    GeneralConceptInclusion(C, E),
+    GeneralConceptInclusion(D, E),
+    GeneralConceptInclusion(F, A),
+    GeneralConceptInclusion(F, E),
+]
+reasoner = ELReasoner(TBox(taxonomy_axioms))
+classification = reasoner.classify()
+taxonomy = reasoner.build_taxonomy()
+check(taxonomy.equivalents("A") == {"A", "B"}, "Equivalents of A: " + str(taxonomy.equivalents("A")))
+for class_name, subsumers in classification.items():
+    strict_subsumers = {subsumer for subsumer in subsumers if class_name not in classification[subsumer]}
+    expected = {frozenset(taxonomy.equivalents(subsumer)) for subsumer in strict_subsumers
+                if not any(subsumer in classification[other] and other not in classification[subsumer]
+                           for other in strict_subsumers)}
+    parents = {frozenset(parent) for parent in taxonomy.direct_superclasses(class_name)}
+    check(parents == expected, "Direct superclasses of " + class_name + ": " + str(parents) + ", expected " +
+          str(expected))
+check(sorted(map(sorted, taxonomy.direct_subclasses("E"))) == [["C"], ["D"]],
+      "Direct subclasses of E: " + str(taxonomy.direct_subclasses("E")))
+visited = set()
+for node in taxonomy:
+    check(all(parent.names <= visited for parent in node.parents), "Taxonomy node before its parents: " + str(node))
+    visited.update(node.names)
+
+
+# Classifying with a pool of workers must give the same subsumers as classifying in a single reasoner
+for file in ["animal.owl", "person.owl", "transport.owl"]:
+    reasoner = ELReasoner(load_tbox(os.path.join(script_dir, "ontologies", file), backend=backend))
+    classification = reasoner.classify()
+    for engine in ["worklist", "naive"]:
+        parallel_classification = classify_parallel(reasoner.ontology, 2, engine=engine)
+        check(parallel_classification == classification, "Parallel classification of " + file + " with the " +
+              engine + " engine: " + str(parallel_classification) + ", expected " + str(classification))
+
+
+# The ⊥-locality module of a class must give the same subsumers (including the existentials) as the whole TBox
+module_tboxes = {file: load_tbox(os.path.join(script_dir, "ontologies", file), backend=backend)
+                 for file in ["animal.owl", "person.owl", "transport.owl"]}
+module_tboxes["incremental axioms"] = TBox(list(incremental_axioms))
+# ∃r.B is a subsumer of A, but only occurs in an axiom outside the module of A, so it is declared relevant there
+module_tboxes["declared concepts"] = TBox([
+    GeneralConceptInclusion(A, ExistentialRoleRestriction("r", ConceptConjunction([B, C]))),
+    GeneralConceptInclusion(D, ExistentialRoleRestriction("r", B)),
+])
+for name, tbox in module_tboxes.items():
+    reasoner = ELReasoner(tbox)
+    for class_name in sorted(tbox.concept_names):
+        subsumers = ELReasoner(extract_module(tbox, [class_name])).get_all_subsumers(class_name)
+        expected = reasoner.get_all_subsumers(class_name)
+        check(subsumers == expected, "Subsumers of " + class_name + " in its module of " + name + ": " +
+              str(subsumers) + ", expected " + str(expected))
+
 print("Tests passed!")
\ No newline at end of file
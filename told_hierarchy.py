@@ -0,0 +1,75 @@
+def strongly_connected_components(successors):
+    # Function to compute the strongly connected components of a graph, given as a dict mapping every node to a list
+    # of its successors, with Tarjan's algorithm (without recursion, so that deep hierarchies do not overflow the
+    # stack). The components are returned in reverse topological order: every component comes after all components
+    # reachable from it.
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    for root in successors:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors.get(root, ())))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors.get(child, ()))))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def compute_told_closure(told_edges):
+    # Function to compute the transitive closure of the told hierarchy between concept names, given as a dict mapping
+    # every concept name to the concept names it is told to be subsumed by (A ⊑ B, and both directions of A ≡ B).
+    # Returns a dict mapping every concept name with told subsumers to the set of all of them, which includes the
+    # concept name itself and is shared by all members of its strongly connected component (it must not be modified).
+    # Cycles (e.g. from equivalence axioms) are collapsed into their strongly connected components, which all have
+    # the same subsumers: the members of the component and the subsumers of the components it has edges to. These
+    # are computed before the component itself, because Tarjan's algorithm returns the components in reverse
+    # topological order, so every component takes a single pass over its edges. The subsumers of a component are
+    # kept as a set, which is merged into the sets of its subclasses with one (C-level) union each; big-int bitsets
+    # over the components are about as fast to merge, but much slower to turn back into concept names. Sharing the
+    # set (rather than copying it without each member) keeps the closure of long chains from taking quadratic time.
+    components = strongly_connected_components(told_edges)
+    component_of = {}
+    subsumers_of_component = []
+    closure = {}
+    for i, component in enumerate(components):
+        for member in component:
+            component_of[member] = i
+        subsumers = set(component)
+        for member in component:
+            for superclass in told_edges.get(member, ()):
+                j = component_of[superclass]
+                if j != i:
+                    subsumers |= subsumers_of_component[j]
+        subsumers_of_component.append(subsumers)
+        if len(subsumers) > 1:
+            for member in component:
+                closure[member] = subsumers
+    return closure